@@ -0,0 +1 @@
+"""Приложение blog: посты пользователей, ленты и поиск."""
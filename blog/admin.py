@@ -1,10 +1,130 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
-from .models import Post
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from . import search
+from .models import AuthorStats, Follow, Post
+
+
+class AuthorFilter(admin.SimpleListFilter):
+    """
+    Фильтр по автору с автодополнением вместо списка всех пользователей.
+
+    В боковой панели рисуется виджет autocomplete админки (поиск по
+    search_fields UserAdmin), из базы загружается только выбранный автор.
+    """
+    title = "автору"
+    parameter_name = 'author'
+    template = 'admin/blog/post/author_filter.html'
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.admin_site = model_admin.admin_site
+        self.base_query_string = ''
+        self.widget_html = ''
+
+    def has_output(self) -> bool:
+        # Виджет нужен и когда автор ещё не выбран
+        return True
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if not value or not value.isdigit():
+            return []
+        return list(User.objects.filter(pk=value).values_list('pk', 'username'))
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(user_id=value)
+        return queryset
+
+    def choices(self, changelist):
+        self.base_query_string = changelist.get_query_string(remove=[self.parameter_name])
+        field = forms.ModelChoiceField(
+            queryset=User.objects.all(),
+            required=False,
+            widget=AutocompleteSelect(Post._meta.get_field('user'), self.admin_site),
+        )
+        self.widget_html = field.widget.render(self.parameter_name, self.value(), attrs={'id': 'author-filter'})
+        yield {
+            'selected': self.value() is None,
+            'query_string': self.base_query_string,
+            'display': "Все",
+        }
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор без точного COUNT(*) по большой таблице.
+
+    Без фильтров число постов оценивается по MAX(id) (один шаг по
+    B-дереву rowid; удалённые посты дают завышение). С фильтрами
+    считается не больше ADMIN_COUNT_LIMIT строк, дальше страницы
+    не нумеруются.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not queryset.query.where:
+            return queryset.order_by().aggregate(max_id=Max('id'))['max_id'] or 0
+        limit = getattr(settings, 'ADMIN_COUNT_LIMIT', 10_000)
+        return queryset.order_by()[:limit].count()
+
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ("title", "user", "created_at", "updated_at")
-    list_filter = ("created_at", "updated_at", "user")
+    list_filter = (AuthorFilter, "created_at", "updated_at")
+    list_select_related = ("user",)
     search_fields = ("title", "content", "user__username")
+    search_help_text = "Полнотекстовый поиск по заголовку, тексту и автору (по началу слов)"
     ordering = ("-created_at",)
     readonly_fields = ("created_at", "updated_at")
+    autocomplete_fields = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        # Виджет фильтра по автору использует select2 из autocomplete админки
+        widget = AutocompleteSelect(Post._meta.get_field('user'), self.admin_site)
+        return super().media + widget.media
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск через FTS5-индекс вместо LIKE '%...%' по текстам постов."""
+        if not search_term.strip():
+            return queryset, False
+        condition = search.post_filter(search_term)
+        if condition is None:
+            return queryset.none(), False
+        return queryset.filter(condition), False
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "post_count", "follower_count", "last_post_at")
+    list_select_related = ("user",)
+    ordering = ("-post_count",)
+    readonly_fields = ("user", "post_count", "follower_count", "last_post_at")
+    search_fields = ("user__username",)
+
+    def has_add_permission(self, request) -> bool:
+        # Строки создаются сигналами и командой reconcile_author_stats
+        return False
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ("follower", "author", "created_at")
+    list_select_related = ("follower", "author")
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at",)
+    autocomplete_fields = ("follower", "author")
+    search_fields = ("follower__username", "author__username")
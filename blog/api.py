@@ -0,0 +1,185 @@
+"""
+Пакетный JSON API для синхронизации постов.
+
+POST /blog/api/batch/ принимает до BLOG_BATCH_MAX_OPERATIONS операций:
+
+    {"operations": [
+        {"op": "create", "ref": "draft-1", "title": "...", "content": "..."},
+        {"op": "update", "id": 42, "title": "..."},
+        {"op": "delete", "id": 43}
+    ]}
+
+Все посты из update/delete загружаются и проверяются на владельца одним
+запросом, поля проверяются PostForm. Если хотя бы одна операция
+некорректна, ничего не записывается и возвращается 400 с результатом по
+каждой операции. Иначе все изменения пишутся в одной транзакции через
+bulk_create / bulk_update / один DELETE, а побочные эффекты (поиск,
+ленты, статистика, кэш страниц) выполняет сигнал posts_bulk_changed.
+"""
+import json
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models.deletion import Collector
+from django.http import HttpRequest, JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from .models import Post
+from .signals import posts_bulk_changed
+from .views import PostForm
+
+OPERATIONS = ('create', 'update', 'delete')
+UPDATED_FIELDS = ['title', 'content', 'rendered_html', 'excerpt', 'updated_at']
+
+
+def get_max_operations() -> int:
+    return getattr(settings, 'BLOG_BATCH_MAX_OPERATIONS', 500)
+
+
+@require_POST
+def post_batch(request: HttpRequest) -> JsonResponse:
+    """Создание, изменение и удаление постов пачкой в одной транзакции."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Требуется вход в систему"}, status=401)
+    try:
+        payload = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({"error": "Некорректный JSON"}, status=400)
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return JsonResponse({"error": "Нужен непустой список operations"}, status=400)
+    if len(operations) > get_max_operations():
+        return JsonResponse(
+            {"error": f"Не больше {get_max_operations()} операций в одном запросе"},
+            status=400,
+        )
+
+    batch = _Batch(request.user, operations)
+    if not batch.validate():
+        return JsonResponse({"committed": False, "results": batch.results}, status=400)
+    batch.commit()
+    return JsonResponse({"committed": True, "results": batch.results})
+
+
+class _Batch:
+    """Проверка и запись одной пачки операций."""
+
+    def __init__(self, user, operations: list):
+        self.user = user
+        self.operations = operations
+        self.results: list[dict] = []
+        self.creates: list[tuple[int, Post]] = []
+        self.updates: list[tuple[int, Post]] = []
+        self.deletes: list[tuple[int, Post]] = []
+
+    def validate(self) -> bool:
+        posts = self._load_posts()
+        seen_ids = set()
+        valid = True
+        for index, operation in enumerate(self.operations):
+            result = {"index": index}
+            if isinstance(operation, dict) and 'ref' in operation:
+                result["ref"] = operation['ref']
+            error = self._validate_one(index, operation, posts, seen_ids)
+            if error is not None:
+                result.update(status="error", errors=error)
+                valid = False
+            else:
+                result["status"] = "valid"
+            self.results.append(result)
+        return valid
+
+    def _load_posts(self) -> dict[int, Post]:
+        # Одна выборка на всю пачку вместо get_object_or_404 на каждый пост
+        ids = {
+            operation['id'] for operation in self.operations
+            if isinstance(operation, dict) and isinstance(operation.get('id'), int)
+        }
+        if not ids:
+            return {}
+        return Post.objects.only('user_id', 'title', 'content', 'created_at', 'updated_at').in_bulk(ids)
+
+    def _validate_one(self, index: int, operation, posts: dict[int, Post], seen_ids: set) -> dict | None:
+        if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+            return {"op": [f"Ожидается одно из: {', '.join(OPERATIONS)}"]}
+        kind = operation['op']
+
+        if kind == 'create':
+            form = PostForm(data={
+                'title': operation.get('title', ''),
+                'content': operation.get('content', ''),
+            })
+            if not form.is_valid():
+                return _form_errors(form)
+            post = form.save(commit=False)
+            post.user = self.user
+            self.creates.append((index, post))
+            return None
+
+        post_id = operation.get('id')
+        if not isinstance(post_id, int):
+            return {"id": ["Нужен числовой id поста"]}
+        if post_id in seen_ids:
+            return {"id": ["Пост встречается в пачке больше одного раза"]}
+        seen_ids.add(post_id)
+        post = posts.get(post_id)
+        if post is None:
+            return {"id": ["Пост не найден"]}
+        if post.user_id != self.user.pk:
+            return {"id": ["Пост принадлежит другому пользователю"]}
+
+        post.user = self.user
+        if kind == 'delete':
+            self.deletes.append((index, post))
+            return None
+
+        # Старая версия карточки удаляется из кэша после записи
+        post._card_updated_at = post.updated_at
+        form = PostForm(
+            data={
+                'title': operation.get('title', post.title),
+                'content': operation.get('content', post.content),
+            },
+            instance=post,
+        )
+        if not form.is_valid():
+            return _form_errors(form)
+        self.updates.append((index, post))
+        return None
+
+    def commit(self) -> None:
+        now = timezone.now()
+        # Collector обнуляет pk удалённых экземпляров
+        deleted_ids = {index: post.pk for index, post in self.deletes}
+        created = [post for _, post in self.creates]
+        updated = [post for _, post in self.updates]
+        for post in created + updated:
+            post.render()
+        for post in updated:
+            post.updated_at = now
+
+        with transaction.atomic():
+            if created:
+                Post.objects.bulk_create(created)
+            if updated:
+                Post.objects.bulk_update(updated, UPDATED_FIELDS)
+            if self.deletes:
+                # Один DELETE по уже загруженным постам; сигналы post_delete
+                # снимают пост с индекса, статистики и кэшей, как при обычном
+                # удалении, а автор у постов уже проставлен и не запрашивается
+                collector = Collector(using=router.db_for_write(Post))
+                collector.collect([post for _, post in self.deletes])
+                collector.delete()
+            if created or updated:
+                posts_bulk_changed.send(sender=Post, posts=created + updated, created=created)
+
+        for status, items in (("created", self.creates), ("updated", self.updates)):
+            for index, post in items:
+                self.results[index].update(status=status, id=post.pk)
+        for index, post_id in deleted_ids.items():
+            self.results[index].update(status="deleted", id=post_id)
+
+
+def _form_errors(form: PostForm) -> dict[str, list[str]]:
+    return {field: list(messages) for field, messages in form.errors.items()}
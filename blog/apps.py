@@ -0,0 +1,14 @@
+"""Конфигурация приложения blog."""
+from django.apps import AppConfig
+
+
+class BlogConfig(AppConfig):
+    """Конфигурация приложения blog."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'blog'
+    verbose_name = 'Блог'
+
+    def ready(self) -> None:
+        # Подключаем обработчики сигналов (синхронизация поискового индекса)
+        from . import signals  # noqa: F401
@@ -0,0 +1,110 @@
+"""
+Асинхронные версии читающих view блога (используются под ASGI).
+
+Запросы к базе идут через асинхронный ORM, отрисовка шаблонов — через
+core.shortcuts.arender. Пользователь загружается заранее через
+request.auser(), чтобы проверки request.user в цикле событий не
+обращались к базе синхронно.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest
+from django.shortcuts import aget_object_or_404
+from django.urls import reverse
+
+from core.page_cache import anonymous_page_cache
+from core.ratelimit import ratelimit
+from core.routers import read_only_view
+from core.shortcuts import arender
+from .conditional import aauthor_validators, author_page_group, follower_count, not_modified, set_validators
+from .models import Follow, Post
+from .pagination import apaginate, page_context
+from . import search
+
+
+async def _load_user(request: HttpRequest) -> None:
+    request.user = await request.auser()
+
+
+async def _posts_page_context(request: HttpRequest, user: User) -> dict:
+    posts, next_cursor = await apaginate(
+        Post.objects.filter(user=user).defer('content'),
+        request.GET.get('cursor'),
+    )
+    return page_context(
+        posts,
+        next_cursor,
+        reverse('user_posts', args=[user.username]),
+        reverse('user_posts_page', args=[user.username]),
+    )
+
+
+@ratelimit('user_search')
+@read_only_view
+async def user_search(request: HttpRequest) -> HttpResponse:
+    """Поиск пользователей по имени, email и текстам их постов."""
+    query = request.GET.get('q', '').strip()
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    results, has_next = [], False
+    if query:
+        results, has_next = await sync_to_async(search.search_users)(query, page)
+
+    return await arender(request, "user_search.html", {
+        "results": results,
+        "query": query,
+        "page": page,
+        "previous_page": page - 1 if page > 1 else None,
+        "next_page": page + 1 if has_next else None,
+    })
+
+
+@anonymous_page_cache(author_page_group)
+@read_only_view
+async def user_posts(request: HttpRequest, username: str) -> HttpResponse:
+    """Просмотр постов конкретного пользователя."""
+    user = await aget_object_or_404(User.objects.select_related('post_stats'), username=username)
+    await _load_user(request)
+    is_following = (
+        request.user.is_authenticated
+        and await Follow.objects.filter(follower=request.user, author=user).aexists()
+    )
+    validators = await aauthor_validators(
+        request, user.pk, user.get_full_name(), follower_count(user), is_following,
+    )
+    response = await sync_to_async(not_modified)(request, validators)
+    if response is not None:
+        return response
+
+    try:
+        context = await _posts_page_context(request, user)
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+
+    context.update({
+        "profile_user": user,
+        "is_own_profile": request.user.is_authenticated and request.user == user,
+        "is_following": is_following,
+    })
+    return set_validators(request, await arender(request, "user_posts.html", context), validators)
+
+
+@anonymous_page_cache(author_page_group)
+@read_only_view
+async def user_posts_page(request: HttpRequest, username: str) -> HttpResponse:
+    """Следующая страница постов пользователя (HTML-фрагмент)."""
+    user = await aget_object_or_404(User, username=username)
+    await _load_user(request)
+    validators = await aauthor_validators(request, user.pk, user.get_full_name())
+    response = await sync_to_async(not_modified)(request, validators)
+    if response is not None:
+        return response
+
+    try:
+        context = await _posts_page_context(request, user)
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+    return set_validators(request, await arender(request, "partials/post_page.html", context), validators)
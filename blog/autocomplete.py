@@ -0,0 +1,180 @@
+"""
+Автодополнение пользователей по префиксу username и имени.
+
+Индекс живёт в памяти процесса: отсортированный список пар (ключ, id)
+в нижнем регистре, где ключи — username, имя, фамилия и полное имя.
+Поиск префикса — bisect и проход по соседним ключам, без обращений к
+базе. Индекс строится при прогреве воркера (main/warmup.py) или при
+первом обращении, обновляется сигналами User в этом процессе и раз в
+AUTOCOMPLETE_TTL секунд перестраивается в фоновом потоке, чтобы
+подхватить изменения, сделанные другими воркерами. Пока идёт
+перестройка, запросы обслуживает прежний индекс.
+
+Размер ограничен AUTOCOMPLETE_MAX_USERS: при большем числе пользователей
+в индекс попадают недавно входившие, а недостающие подсказки
+добираются запросом ``istartswith`` к базе.
+"""
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import F, Q
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """Подсказка: пользователь и его полное имя."""
+    user_id: int
+    username: str
+    full_name: str
+
+
+def get_limit() -> int:
+    """Максимальное число подсказок в ответе."""
+    return getattr(settings, 'AUTOCOMPLETE_LIMIT', 10)
+
+
+def _keys(username: str, first_name: str, last_name: str) -> set[str]:
+    full_name = f"{first_name} {last_name}".strip()
+    return {key.lower() for key in (username, first_name, last_name, full_name) if key}
+
+
+class PrefixIndex:
+    """Отсортированный индекс префиксов с инкрементальными обновлениями."""
+
+    def __init__(self, max_users: int, ttl: float):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: list[tuple[str, int]] = []
+        self._users: dict[int, tuple[Suggestion, set[str]]] = {}
+        self._built_at: float | None = None
+        self._complete = False
+        self._rebuilding = False
+
+    def build(self) -> int:
+        """Строит индекс заново по базе. Возвращает число пользователей."""
+        rows = (
+            User.objects.filter(is_active=True)
+            .order_by(F('last_login').desc(nulls_last=True), '-id')
+            .values_list('id', 'username', 'first_name', 'last_name')[:self.max_users + 1]
+        )
+        users, entries = {}, []
+        for user_id, username, first_name, last_name in rows:
+            if len(users) >= self.max_users:
+                break
+            keys = _keys(username, first_name, last_name)
+            users[user_id] = (Suggestion(user_id, username, f"{first_name} {last_name}".strip()), keys)
+            entries.extend((key, user_id) for key in keys)
+        entries.sort()
+        with self._lock:
+            self._users = users
+            self._entries = entries
+            self._complete = len(rows) <= self.max_users
+            self._built_at = time.monotonic()
+        return len(users)
+
+    def ensure_built(self) -> None:
+        """Строит индекс при первом обращении, устаревший — перестраивает в фоне."""
+        built_at = self._built_at
+        if built_at is None:
+            self.build()
+        elif time.monotonic() - built_at > self.ttl:
+            with self._lock:
+                if self._rebuilding:
+                    return
+                self._rebuilding = True
+            threading.Thread(target=self._rebuild_in_background, name='autocomplete-rebuild', daemon=True).start()
+
+    def _rebuild_in_background(self) -> None:
+        try:
+            self.build()
+        finally:
+            self._rebuilding = False
+            # Подключения к базе у каждого потока свои
+            connections.close_all()
+
+    def update(self, user: User) -> None:
+        """Добавляет или обновляет пользователя (из сигнала post_save)."""
+        if self._built_at is None:
+            return
+        if not user.is_active:
+            self.remove(user.pk)
+            return
+        keys = _keys(user.username, user.first_name, user.last_name)
+        suggestion = Suggestion(user.pk, user.username, user.get_full_name())
+        with self._lock:
+            self._remove_locked(user.pk)
+            if len(self._users) >= self.max_users:
+                # Места нет: пользователь будет найден запросом к базе
+                self._complete = False
+                return
+            self._users[user.pk] = (suggestion, keys)
+            for key in keys:
+                bisect.insort(self._entries, (key, user.pk))
+
+    def remove(self, user_id: int) -> None:
+        """Удаляет пользователя (из сигнала post_delete)."""
+        with self._lock:
+            self._remove_locked(user_id)
+
+    def _remove_locked(self, user_id: int) -> None:
+        previous = self._users.pop(user_id, None)
+        if previous is None:
+            return
+        for key in previous[1]:
+            position = bisect.bisect_left(self._entries, (key, user_id))
+            if position < len(self._entries) and self._entries[position] == (key, user_id):
+                del self._entries[position]
+
+    def lookup(self, prefix: str, limit: int) -> list[Suggestion]:
+        """Пользователи, у которых username или имя начинается с prefix."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        self.ensure_built()
+        found: dict[int, Suggestion] = {}
+        with self._lock:
+            position = bisect.bisect_left(self._entries, (prefix,))
+            while position < len(self._entries) and len(found) < limit:
+                key, user_id = self._entries[position]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(user_id, self._users[user_id][0])
+                position += 1
+            complete = self._complete
+        if not complete and len(found) < limit:
+            found.update(self._lookup_database(prefix, limit - len(found), exclude=found.keys()))
+        return list(found.values())
+
+    @staticmethod
+    def _lookup_database(prefix: str, limit: int, exclude) -> dict[int, Suggestion]:
+        rows = (
+            User.objects.filter(is_active=True)
+            .filter(Q(username__istartswith=prefix) | Q(first_name__istartswith=prefix) | Q(last_name__istartswith=prefix))
+            .exclude(pk__in=list(exclude))
+            .order_by('username')
+            .values_list('id', 'username', 'first_name', 'last_name')[:limit]
+        )
+        return {
+            user_id: Suggestion(user_id, username, f"{first_name} {last_name}".strip())
+            for user_id, username, first_name, last_name in rows
+        }
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+index = PrefixIndex(
+    max_users=getattr(settings, 'AUTOCOMPLETE_MAX_USERS', 100_000),
+    ttl=getattr(settings, 'AUTOCOMPLETE_TTL', 300),
+)
+
+
+def suggest(prefix: str, limit: int | None = None) -> list[Suggestion]:
+    """Подсказки для строки поиска пользователей."""
+    return index.lookup(prefix, limit or get_limit())
@@ -0,0 +1,234 @@
+"""
+Сжатие текстов постов в базе.
+
+Длинный текст хранится как BLOB: заголовок (кодек и id словаря) и сжатые
+данные. Короткие тексты и тексты, которые не сжимаются, остаются обычной
+строкой, поэтому в одной колонке SQLite спокойно лежат оба вида значений
+и старые строки читаются без миграции данных.
+
+Словарь обучается на существующих постах (``manage.py
+compress_post_content --train``) и сохраняется в CompressionDictionary:
+у коротких постов на одном языке много общих слов и разметки, и словарь
+заметно улучшает сжатие. Старые словари не удаляются — ими распаковываются
+записи, сжатые до переобучения.
+
+Кодеки: zlib (raw deflate с preset dictionary) из стандартной библиотеки
+и zstd, если установлен пакет zstandard.
+"""
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard необязателен
+    zstandard = None
+
+ZLIB = 'zlib'
+ZSTD = 'zstd'
+
+_CODEC_IDS = {ZLIB: 1, ZSTD: 2}
+_CODEC_NAMES = {codec_id: name for name, codec_id in _CODEC_IDS.items()}
+
+# Заголовок сжатого значения: id кодека и id словаря (0 — без словаря)
+_HEADER = struct.Struct('>BI')
+
+# Окно deflate — 32 КБ, больший словарь zlib не использует
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+ZSTD_DICTIONARY_SIZE = 64 * 1024
+
+# Уровни сжатия: при сохранении поста — умеренный, чтобы запись не ждала
+# сжатия; compress_post_content пересжимает посты в фоне максимальным
+ONLINE_LEVELS = {ZLIB: 6, ZSTD: 6}
+MAX_LEVELS = {ZLIB: 9, ZSTD: 19}
+
+# Через сколько секунд процесс перечитывает id текущего словаря, чтобы
+# подхватить словарь, обученный в другом процессе
+_CURRENT_TTL = 5 * 60
+
+_WORD_RE = re.compile(r'\w+[^\w\n]{0,2}', re.UNICODE)
+
+_lock = threading.Lock()
+_dictionaries: dict[int, bytes] = {}
+_current: dict[str, tuple[int, float]] = {}
+# Объекты zstd нельзя использовать из нескольких потоков одновременно,
+# поэтому компрессоры и декомпрессоры у каждого потока свои
+_local = threading.local()
+
+
+class Compressed(bytes):
+    """Сжатый текст из базы, ещё не распакованный (см. blog/fields.py)."""
+
+
+def get_algorithm() -> str | None:
+    """Кодек для новых записей или None, если сжатие выключено."""
+    algorithm = getattr(settings, 'BLOG_CONTENT_COMPRESSION', ZLIB)
+    if algorithm == ZSTD and zstandard is None:
+        # Без пакета zstandard новые записи сжимаются zlib
+        return ZLIB
+    if algorithm not in (None, ZLIB, ZSTD):
+        raise ImproperlyConfigured(f"Неизвестный алгоритм сжатия {algorithm!r}")
+    return algorithm
+
+
+def get_min_length() -> int:
+    """Тексты короче (в байтах UTF-8) хранятся без сжатия."""
+    return getattr(settings, 'BLOG_CONTENT_COMPRESSION_MIN_LENGTH', 512)
+
+
+def compress(text: str, algorithm: str | None = None, level: int | None = None) -> str | bytes:
+    """
+    Сжимает текст текущим словарём, если это имеет смысл.
+    level по умолчанию — ONLINE_LEVELS для кодека.
+    """
+    algorithm = algorithm or get_algorithm()
+    data = text.encode()
+    if algorithm is None or len(data) < get_min_length():
+        return text
+    level = level or ONLINE_LEVELS[algorithm]
+    dictionary_id = _current_dictionary_id(algorithm)
+    if algorithm == ZSTD:
+        body = _zstd_compressor(dictionary_id, level).compress(data)
+    else:
+        dictionary = _load_dictionary(dictionary_id) if dictionary_id else None
+        compressor = (
+            zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary) if dictionary
+            else zlib.compressobj(level, zlib.DEFLATED, -15)
+        )
+        body = compressor.compress(data) + compressor.flush()
+    payload = _HEADER.pack(_CODEC_IDS[algorithm], dictionary_id) + body
+    return payload if len(payload) < len(data) else text
+
+
+def decompress(payload: bytes) -> str:
+    """Распаковывает значение, сжатое compress()."""
+    codec_id, dictionary_id = _HEADER.unpack_from(payload)
+    body = memoryview(payload)[_HEADER.size:]
+    codec = _CODEC_NAMES.get(codec_id)
+    if codec == ZSTD:
+        return _zstd_decompressor(dictionary_id).decompress(body).decode()
+    if codec == ZLIB:
+        dictionary = _load_dictionary(dictionary_id) if dictionary_id else None
+        decompressor = (
+            zlib.decompressobj(-15, zdict=dictionary) if dictionary
+            else zlib.decompressobj(-15)
+        )
+        return (decompressor.decompress(body) + decompressor.flush()).decode()
+    raise ValueError(f"Неизвестный кодек сжатого текста: {codec_id}")
+
+
+def train(samples: list[str], algorithm: str | None = None, size: int | None = None):
+    """
+    Обучает словарь на примерах текстов и делает его текущим.
+    Возвращает сохранённый CompressionDictionary.
+    """
+    algorithm = algorithm or get_algorithm() or ZLIB
+    encoded = [text.encode() for text in samples if text]
+    if algorithm == ZSTD:
+        if zstandard is None:
+            raise ImproperlyConfigured("Для словаря zstd установите пакет zstandard")
+        data = zstandard.train_dictionary(size or ZSTD_DICTIONARY_SIZE, encoded).as_bytes()
+    else:
+        data = _train_zlib(encoded, size or ZLIB_DICTIONARY_SIZE)
+
+    model = apps.get_model('blog', 'CompressionDictionary')
+    dictionary = model.objects.create(algorithm=algorithm, data=data, samples=len(encoded))
+    with _lock:
+        _dictionaries[dictionary.pk] = data
+        _current[algorithm] = (dictionary.pk, time.monotonic())
+    return dictionary
+
+
+def _train_zlib(samples: list[bytes], size: int) -> bytes:
+    """
+    Словарь для deflate: частые слова и пары слов, выгоднейшие — в конце
+    (ближе к сжимаемым данным, значит, короче ссылки на них).
+    """
+    counts = Counter()
+    for sample in samples:
+        words = _WORD_RE.findall(sample.decode())
+        counts.update(words)
+        counts.update(first + second for first, second in zip(words, words[1:]))
+    scored = sorted(
+        ((count * len(text.encode()), text.encode()) for text, count in counts.items() if count > 1),
+        reverse=True,
+    )
+    chosen, total = [], 0
+    for _, text in scored:
+        if total + len(text) > size:
+            continue
+        chosen.append(text)
+        total += len(text)
+    return b''.join(reversed(chosen))
+
+
+@lru_cache(maxsize=32)
+def _zstd_dictionary(dictionary_id: int, level: int | None = None):
+    """
+    Словарь zstd; с level — подготовленный для сжатия этим уровнем.
+    Словари не меняются после создания, поэтому кэш не устаревает.
+    """
+    dictionary = zstandard.ZstdCompressionDict(_load_dictionary(dictionary_id))
+    if level is not None:
+        dictionary.precompute_compress(level=level)
+    return dictionary
+
+
+def _zstd_compressor(dictionary_id: int, level: int):
+    if zstandard is None:
+        raise ImproperlyConfigured("Для сжатия zstd установите пакет zstandard")
+    compressors = _local.__dict__.setdefault('compressors', {})
+    compressor = compressors.get((dictionary_id, level))
+    if compressor is None:
+        compressor = compressors[dictionary_id, level] = (
+            zstandard.ZstdCompressor(level=level, dict_data=_zstd_dictionary(dictionary_id, level)) if dictionary_id
+            else zstandard.ZstdCompressor(level=level)
+        )
+    return compressor
+
+
+def _zstd_decompressor(dictionary_id: int):
+    if zstandard is None:
+        raise ImproperlyConfigured("Текст сжат zstd, установите пакет zstandard")
+    decompressors = _local.__dict__.setdefault('decompressors', {})
+    decompressor = decompressors.get(dictionary_id)
+    if decompressor is None:
+        decompressor = decompressors[dictionary_id] = (
+            zstandard.ZstdDecompressor(dict_data=_zstd_dictionary(dictionary_id)) if dictionary_id
+            else zstandard.ZstdDecompressor()
+        )
+    return decompressor
+
+
+def _current_dictionary_id(algorithm: str) -> int:
+    with _lock:
+        cached = _current.get(algorithm)
+    if cached is not None and time.monotonic() - cached[1] < _CURRENT_TTL:
+        return cached[0]
+    model = apps.get_model('blog', 'CompressionDictionary')
+    dictionary_id = (
+        model.objects.filter(algorithm=algorithm).order_by('-pk').values_list('pk', flat=True).first() or 0
+    )
+    with _lock:
+        _current[algorithm] = (dictionary_id, time.monotonic())
+    return dictionary_id
+
+
+def _load_dictionary(dictionary_id: int) -> bytes:
+    with _lock:
+        data = _dictionaries.get(dictionary_id)
+    if data is None:
+        # Словари не меняются после создания, кэш процесса не устаревает
+        model = apps.get_model('blog', 'CompressionDictionary')
+        data = bytes(model.objects.values_list('data', flat=True).get(pk=dictionary_id))
+        with _lock:
+            _dictionaries[dictionary_id] = data
+    return data
@@ -0,0 +1,91 @@
+"""
+Условные GET-запросы (ETag) для страниц с постами автора.
+
+Валидатор строится из одного агрегатного запроса по постам автора
+(MAX(updated_at) и COUNT(*)), состояния зрителя и адреса страницы.
+Если клиент прислал совпадающий If-None-Match, ответ 304 отдаётся до
+отрисовки шаблона.
+
+Last-Modified не отдаётся: страница зависит не только от даты последней
+правки (удаление старого поста, имя автора, подписчики), и клиент,
+перепроверяющий только по If-Modified-Since, получил бы неверный 304.
+"""
+import hashlib
+from dataclasses import dataclass
+
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from .models import Post
+
+
+_STATE_AGGREGATES = {'last_modified': Max('updated_at'), 'count': Count('id')}
+
+
+@dataclass
+class Validators:
+    """ETag страницы."""
+    etag: str
+
+
+def author_validators(request: HttpRequest, author_id: int, *extra) -> Validators:
+    """Валидаторы страницы с постами автора для текущего зрителя."""
+    state = Post.objects.filter(user_id=author_id).aggregate(**_STATE_AGGREGATES)
+    return _build_validators(request, author_id, state, extra)
+
+
+async def aauthor_validators(request: HttpRequest, author_id: int, *extra) -> Validators:
+    """Асинхронный вариант author_validators(); request.user должен быть уже загружен."""
+    state = await Post.objects.filter(user_id=author_id).aaggregate(**_STATE_AGGREGATES)
+    return _build_validators(request, author_id, state, extra)
+
+
+def _build_validators(request: HttpRequest, author_id: int, state: dict, extra: tuple) -> Validators:
+    viewer = request.user.pk if request.user.is_authenticated else 0
+    parts = [
+        author_id, state['count'], state['last_modified'], viewer,
+        request.get_full_path(), *extra,
+    ]
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return Validators(etag=quote_etag(digest))
+
+
+def follower_count(user) -> int:
+    """Число подписчиков автора из AuthorStats (загруженной select_related('post_stats'))."""
+    stats = getattr(user, 'post_stats', None)
+    return stats.follower_count if stats is not None else 0
+
+
+def author_page_group(request: HttpRequest, username: str, **kwargs) -> str:
+    """Группа кэша анонимных страниц автора (core.page_cache)."""
+    return f"author:{username}"
+
+
+def not_modified(request: HttpRequest, validators: Validators) -> HttpResponse | None:
+    """
+    Ответ 304 (или 412), если у клиента актуальная версия страницы, иначе None.
+
+    При непоказанных flash-сообщениях страницу всегда отдаём целиком,
+    иначе сообщение не попадёт к пользователю.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if len(messages.get_messages(request)):
+        return None
+    response = get_conditional_response(request, etag=validators.etag)
+    if response is not None:
+        set_validators(request, response, validators)
+    return response
+
+
+def set_validators(request: HttpRequest, response: HttpResponse, validators: Validators) -> HttpResponse:
+    """Проставляет ETag и требование перепроверки."""
+    response.headers['ETag'] = validators.etag
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
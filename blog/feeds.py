@@ -0,0 +1,158 @@
+"""
+Atom- и RSS-ленты постов автора.
+
+Тело ленты строится из последних постов (готовый rendered_html, без
+перерисовки текста) и кэшируется вместе с ETag и Last-Modified. Ключ
+кэша содержит версию ленты автора: после изменения постов или самого
+автора сигналы меняют версию после фиксации транзакции, и ленту
+собирает следующий опрос. С общим кэшем (DJANGO_CACHE) фоновая задача
+(blog/tasks.py) заранее собирает ленты для SITE_URL; кэш в памяти
+процесса воркера сайту не виден, и сборка там не нужна. Пока версия
+прежняя, опрос читалкой стоит одного запроса к кэшу и одного — за автором.
+"""
+import hashlib
+import io
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpRequest
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.http import quote_etag
+
+from .models import Post
+
+FORMATS = {
+    'atom': feedgenerator.Atom1Feed,
+    'rss': feedgenerator.Rss201rev2Feed,
+}
+
+# Маршрут ленты каждого формата (core/urls.py)
+ROUTES = {
+    'atom': 'user_feed_atom',
+    'rss': 'user_feed_rss',
+}
+
+_VERSION_KEY = 'feed:version:{}'
+# Размер кусков, которыми тело ленты отдаётся в потоковом ответе
+CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class CachedFeed:
+    """Готовое тело ленты и его валидаторы."""
+    body: bytes
+    content_type: str
+    etag: str
+    last_modified: int | None
+
+
+def get_cache():
+    return caches[getattr(settings, 'BLOG_FEED_CACHE', 'default')]
+
+
+def get_feed_size() -> int:
+    """Количество последних постов в ленте."""
+    return getattr(settings, 'BLOG_FEED_SIZE', 20)
+
+
+def get_feed(request: HttpRequest, author: User, kind: str) -> CachedFeed:
+    """Лента автора в формате kind из кэша или собранная заново."""
+    return _cached_feed(f"{request.scheme}://{request.get_host()}", author, kind)
+
+
+def _cached_feed(base_url: str, author: User, kind: str) -> CachedFeed:
+    cache = get_cache()
+    version = cache.get(_VERSION_KEY.format(author.pk), 0)
+    # Абсолютные ссылки в ленте зависят от адреса сайта, поэтому он входит в ключ
+    site = hashlib.md5(base_url.encode(), usedforsecurity=False).hexdigest()[:8]
+    key = f"feed:{kind}:{author.pk}:{version}:{site}"
+    feed = cache.get(key)
+    if feed is None:
+        feed = build_feed(base_url, author, kind)
+        cache.set(key, feed, getattr(settings, 'BLOG_FEED_CACHE_TIMEOUT', 24 * 60 * 60))
+    return feed
+
+
+def build_feed(base_url: str, author: User, kind: str) -> CachedFeed:
+    """Собирает ленту из последних постов автора; base_url — схема и хост сайта."""
+    page_url = base_url + reverse('user_posts', args=[author.username])
+    feed = FORMATS[kind](
+        title=f"{author.get_full_name() or author.username} — посты",
+        link=page_url,
+        description=f"Последние посты пользователя {author.username}",
+        language='ru',
+        author_name=author.get_full_name() or author.username,
+        feed_url=base_url + reverse(ROUTES[kind], args=[author.username]),
+    )
+    posts = (
+        Post.objects.filter(user=author)
+        .only('title', 'rendered_html', 'created_at', 'updated_at')
+        .order_by('-created_at', 'id')[:get_feed_size()]
+    )
+    last_modified = None
+    for post in posts:
+        feed.add_item(
+            title=post.title,
+            link=f"{page_url}#post-{post.pk}",
+            description=post.rendered_html,
+            unique_id=f"{page_url}#post-{post.pk}",
+            unique_id_is_permalink=False,
+            pubdate=post.created_at,
+            updateddate=post.updated_at,
+        )
+        if last_modified is None or post.updated_at > last_modified:
+            last_modified = post.updated_at
+
+    output = io.StringIO()
+    feed.write(output, 'utf-8')
+    body = output.getvalue().encode('utf-8')
+    return CachedFeed(
+        body=body,
+        content_type=feed.content_type,
+        etag=quote_etag(hashlib.md5(body, usedforsecurity=False).hexdigest()),
+        last_modified=_timestamp(last_modified),
+    )
+
+
+def iter_chunks(body: bytes):
+    """Тело ленты кусками для StreamingHttpResponse."""
+    for start in range(0, len(body), CHUNK_SIZE):
+        yield body[start:start + CHUNK_SIZE]
+
+
+def invalidate(author_id: int | None) -> None:
+    """Сбрасывает все ленты автора после фиксации текущей транзакции."""
+    if author_id is None:
+        return
+    transaction.on_commit(
+        lambda: get_cache().set(_VERSION_KEY.format(author_id), time.time_ns(), None),
+        robust=True,
+    )
+
+
+def is_cache_shared() -> bool:
+    """Виден ли кэш лент всем процессам сайта."""
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def regenerate(author: User) -> None:
+    """
+    Собирает ленты автора для основного адреса сайта (SITE_URL), чтобы
+    читалки не ждали сборки. Вызывается из фоновой задачи после сброса
+    версии в запросе; с кэшем в памяти процесса ничего не делает.
+    """
+    if not is_cache_shared():
+        return
+    base_url = settings.SITE_URL.rstrip('/')
+    for kind in ROUTES:
+        _cached_feed(base_url, author, kind)
+
+
+def _timestamp(value: datetime | None) -> int | None:
+    return int(value.timestamp()) if value is not None else None
@@ -0,0 +1,60 @@
+"""Поля моделей блога."""
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+from . import compression
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Распаковывает значение при первом обращении к атрибуту."""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, compression.Compressed):
+            value = instance.__dict__[self.field.attname] = compression.decompress(value)
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """
+    Текст, который на SQLite хранится сжатым (см. blog/compression.py).
+
+    Из базы значение приходит сжатым и распаковывается только при чтении
+    атрибута, так что загрузка модели, которой текст не нужен, ничего
+    не стоит. Не тронутый текст сохраняется обратно как есть. values() и
+    values_list() возвращают сырые Compressed; распаковать их можно
+    compression.decompress(). Поиск по тексту — через FTS5-индекс
+    (blog/search.py), icontains по сжатым строкам не работает.
+    """
+    descriptor_class = CompressedTextDescriptor
+
+    def from_db_value(self, value, expression, connection):
+        if isinstance(value, bytes):
+            return compression.Compressed(value)
+        return value
+
+    def to_python(self, value):
+        if isinstance(value, compression.Compressed):
+            return compression.decompress(value)
+        return super().to_python(value)
+
+    def pre_save(self, model_instance, add):
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, compression.Compressed):
+            return value
+        return super().pre_save(model_instance, add)
+
+    def get_db_prep_save(self, value, connection):
+        if isinstance(value, compression.Compressed):
+            return bytes(value)
+        value = super().get_db_prep_save(value, connection)
+        # Выражения (например, Case из bulk_update) сжимаются по своим значениям;
+        # на других СУБД колонка строго текстовая
+        if not isinstance(value, str) or connection.vendor != 'sqlite':
+            return value
+        return compression.compress(value)
@@ -0,0 +1,109 @@
+"""
+Кэш HTML-карточек постов.
+
+Карточка одного поста одинакова для всех читателей, поэтому её разметка
+кэшируется по ключу (вариант, id поста, updated_at). Изменённый пост
+получает новый ключ сам собой, а сигналы (blog/signals.py) точечно удаляют
+устаревшие записи, чтобы они не занимали место до истечения срока.
+
+Счётчики попаданий и промахов копятся в процессе и периодически
+сбрасываются в тот же кэш, поэтому при файловом или DB-кэше видна сумма
+по всем воркерам (``manage.py post_card_cache_stats``).
+"""
+import threading
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+from .models import Post
+
+TEMPLATE = "partials/post_card.html"
+
+# Варианты карточки: со ссылками управления (свой блог) и публичная
+VARIANT_OWNER = 'owner'
+VARIANT_PUBLIC = 'public'
+VARIANTS = (VARIANT_OWNER, VARIANT_PUBLIC)
+
+STAT_NAMES = ('hits', 'misses', 'evictions')
+_STATS_KEY = 'post_card:stats:{}'
+# Через сколько событий локальные счётчики сбрасываются в общий кэш
+_STATS_FLUSH_EVERY = 50
+
+_local_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'POST_CARD_CACHE', 'default')]
+
+
+def cache_key(variant: str, post_id: int, updated_at: datetime) -> str:
+    return f"post_card:{variant}:{post_id}:{updated_at.timestamp():.6f}"
+
+
+def render_card(post: Post, show_actions: bool = False) -> str:
+    """HTML карточки поста из кэша или свежеотрисованный."""
+    variant = VARIANT_OWNER if show_actions else VARIANT_PUBLIC
+    key = cache_key(variant, post.pk, post.updated_at)
+    cache = get_cache()
+    html = cache.get(key)
+    if html is not None:
+        _count('hits')
+        return html
+    _count('misses')
+    html = render_to_string(TEMPLATE, {"post": post, "show_actions": show_actions})
+    cache.set(key, html, getattr(settings, 'POST_CARD_CACHE_TIMEOUT', 24 * 60 * 60))
+    return html
+
+
+def evict(post_id: int, updated_at: datetime | None) -> None:
+    """Удаляет из кэша все варианты карточки поста с данной updated_at."""
+    if updated_at is None:
+        return
+    get_cache().delete_many([cache_key(variant, post_id, updated_at) for variant in VARIANTS])
+    _count('evictions')
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _local_stats[name] += 1
+        if _local_stats.total() < _STATS_FLUSH_EVERY:
+            return
+        pending = dict(_local_stats)
+        _local_stats.clear()
+    _flush(pending)
+
+
+def _flush(pending: dict[str, int]) -> None:
+    cache = get_cache()
+    for name, value in pending.items():
+        key = _STATS_KEY.format(name)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            # Счётчика ещё нет (или он вытеснен) — заводим заново
+            cache.set(key, value, None)
+
+
+def stats() -> dict[str, int]:
+    """Суммарные счётчики: общие из кэша плюс ещё не сброшенные локальные."""
+    with _stats_lock:
+        local = dict(_local_stats)
+    shared = get_cache().get_many([_STATS_KEY.format(name) for name in STAT_NAMES])
+    result = {
+        name: shared.get(_STATS_KEY.format(name), 0) + local.get(name, 0)
+        for name in STAT_NAMES
+    }
+    lookups = result['hits'] + result['misses']
+    result['hit_ratio'] = round(result['hits'] / lookups, 4) if lookups else 0.0
+    return result
+
+
+def reset_stats() -> None:
+    """Обнуляет счётчики."""
+    with _stats_lock:
+        _local_stats.clear()
+    get_cache().delete_many([_STATS_KEY.format(name) for name in STAT_NAMES])
@@ -0,0 +1,206 @@
+"""
+Сжатие текстов существующих постов и их HTML (см. blog/compression.py).
+
+Новые и изменённые посты сжимаются при сохранении, эта команда переводит
+старые строки пачками, каждая пачка — отдельная короткая транзакция:
+
+    python manage.py compress_post_content --train --benchmark
+    python manage.py compress_post_content --recompress   # после переобучения
+    python manage.py compress_post_content --decompress   # вернуть как было
+
+С --benchmark до и после перевода замеряются занятое базой место, объём
+текстов, задержка страниц со списком постов и время чтения всех текстов.
+"""
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from blog import compression
+from blog.models import Post
+
+# Сжимаемые колонки постов
+COMPRESSED_FIELDS = ('content', 'rendered_html')
+
+
+class Command(BaseCommand):
+    help = "Сжимает тексты существующих постов пачками"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Постов в одной транзакции")
+        parser.add_argument('--train', action='store_true', help="Сначала обучить новый словарь")
+        parser.add_argument('--sample', type=int, default=2000, help="Постов в выборке для обучения словаря")
+        parser.add_argument(
+            '--recompress', action='store_true',
+            help="Пересжать и уже сжатые тексты (после обучения нового словаря)",
+        )
+        parser.add_argument('--decompress', action='store_true', help="Распаковать все тексты обратно")
+        parser.add_argument('--vacuum', action='store_true', help="Выполнить VACUUM, чтобы вернуть место на диске")
+        parser.add_argument('--benchmark', action='store_true', help="Замерить размер и задержки до и после")
+        parser.add_argument('--requests', type=int, default=30, help="Запросов к странице в замере")
+
+    def handle(self, *args, **options):
+        connection = connections[router.db_for_write(Post)]
+        if connection.vendor != 'sqlite':
+            raise CommandError("Сжатие текстов поддерживается только на SQLite")
+        if options['decompress'] and (options['train'] or options['recompress']):
+            raise CommandError("--decompress нельзя сочетать с --train и --recompress")
+        algorithm = compression.get_algorithm()
+        if algorithm is None and not options['decompress']:
+            raise CommandError("Сжатие выключено (BLOG_CONTENT_COMPRESSION = None)")
+
+        before = self._measure(connection, options) if options['benchmark'] else None
+
+        if options['train']:
+            dictionary = compression.train(self._samples(options['sample']), algorithm)
+            self.stdout.write(
+                f"Обучен словарь {dictionary} на {dictionary.samples} постах, {len(dictionary.data)} байт"
+            )
+
+        started = time.perf_counter()
+        changed, size_before, size_after = self._convert(connection, options)
+        elapsed = time.perf_counter() - started
+        ratio = size_after / size_before if size_before else 1.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Изменено значений (тексты и HTML): {changed} за {elapsed:.2f} с; "
+            f"объём {size_before / 1024:.0f} → {size_after / 1024:.0f} КБ ({ratio:.0%})"
+        ))
+
+        if options['vacuum']:
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+
+        if before is not None:
+            self._print_comparison(before, self._measure(connection, options))
+
+    def _samples(self, size: int) -> list[str]:
+        """Случайная выборка текстов по id без ORDER BY RANDOM() по всей таблице."""
+        ids = list(Post.objects.values_list('pk', flat=True))
+        chosen = random.sample(ids, min(size, len(ids)))
+        return [post.content for post in Post.objects.only('content').filter(pk__in=chosen).iterator()]
+
+    def _convert(self, connection, options) -> tuple[int, int, int]:
+        """Переписывает тексты и их HTML. Возвращает число изменённых строк и объём до и после."""
+        totals = [0, 0, 0]
+        for field in COMPRESSED_FIELDS:
+            for index, value in enumerate(self._convert_column(connection, field, options)):
+                totals[index] += value
+        return tuple(totals)
+
+    def _convert_column(self, connection, field: str, options) -> tuple[int, int, int]:
+        """Переписывает одну колонку пачками по id."""
+        table = Post._meta.db_table
+        column = Post._meta.get_field(field).column
+        changed = size_before = size_after = 0
+        last_id = 0
+        while True:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT id, "{column}" FROM "{table}" WHERE id > %s ORDER BY id LIMIT %s',
+                    [last_id, options['batch_size']],
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                updates = []
+                for post_id, value in rows:
+                    new_value = self._converted(value, options)
+                    stored = _stored_size(value)
+                    size_before += stored
+                    if new_value is None:
+                        size_after += stored
+                        continue
+                    size_after += _stored_size(new_value)
+                    updates.append((new_value, post_id))
+                if updates:
+                    cursor.executemany(f'UPDATE "{table}" SET "{column}" = %s WHERE id = %s', updates)
+                    changed += len(updates)
+            self.stderr.write(f"  {field}: обработано до id {last_id}, изменено {changed}")
+        return changed, size_before, size_after
+
+    def _converted(self, value, options) -> str | bytes | None:
+        """Новое значение колонки или None, если строку менять не нужно."""
+        is_compressed = isinstance(value, bytes)
+        if options['decompress']:
+            return compression.decompress(value) if is_compressed else None
+        if is_compressed and not options['recompress']:
+            return None
+        text = compression.decompress(value) if is_compressed else value
+        # Пересжатие идёт в фоне, поэтому — максимальным уровнем
+        algorithm = compression.get_algorithm()
+        new_value = compression.compress(text, algorithm, level=compression.MAX_LEVELS[algorithm])
+        if isinstance(new_value, str) and not is_compressed:
+            return None
+        return new_value
+
+    def _measure(self, connection, options) -> dict:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA page_size')
+            page_size = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_count')
+            page_count = cursor.fetchone()[0]
+            cursor.execute('PRAGMA freelist_count')
+            free_pages = cursor.fetchone()[0]
+            cursor.execute(
+                'SELECT COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0), '
+                'COALESCE(SUM(LENGTH(CAST(rendered_html AS BLOB))), 0) '
+                f'FROM "{Post._meta.db_table}"'
+            )
+            content_bytes, html_bytes = cursor.fetchone()
+
+        result = {
+            'db_used_kb': (page_count - free_pages) * page_size / 1024,
+            'content_kb': content_bytes / 1024,
+            'html_kb': html_bytes / 1024,
+        }
+
+        author = User.objects.annotate(post_count=Count('posts')).order_by('-post_count').first()
+        if author is not None:
+            # Вошедший пользователь: страница не берётся из кэша анонимных страниц
+            client = Client(SERVER_NAME='localhost')
+            client.force_login(author)
+            for name, path in (
+                ('blog_p50_ms', reverse('blog')),
+                ('user_posts_p50_ms', reverse('user_posts', args=[author.username])),
+            ):
+                client.get(path)
+                latencies = []
+                for _ in range(options['requests']):
+                    started = time.perf_counter()
+                    client.get(path)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                result[name] = statistics.median(latencies)
+
+        started = time.perf_counter()
+        for post in Post.objects.only('content').iterator(chunk_size=2000):
+            post.content  # noqa: B018 - чтение с распаковкой
+        result['read_all_ms'] = (time.perf_counter() - started) * 1000
+        return result
+
+    def _print_comparison(self, before: dict, after: dict) -> None:
+        labels = {
+            'db_used_kb': "Занято в базе, КБ",
+            'content_kb': "Тексты постов, КБ",
+            'html_kb': "HTML постов, КБ",
+            'blog_p50_ms': "Свой блог, p50 мс",
+            'user_posts_p50_ms': "Страница автора, p50 мс",
+            'read_all_ms': "Чтение всех текстов, мс",
+        }
+        self.stdout.write("\nЗамер до и после:")
+        for key, label in labels.items():
+            if key not in before:
+                continue
+            old, new = before[key], after[key]
+            change = (new - old) / old * 100 if old else 0.0
+            self.stdout.write(f"{label:<26} {old:>10.1f} → {new:>10.1f} ({change:+.1f}%)")
+
+
+def _stored_size(value: str | bytes) -> int:
+    return len(value) if isinstance(value, bytes) else len(value.encode())
@@ -0,0 +1,69 @@
+"""
+Потоковая выгрузка постов в JSON Lines.
+
+Каждая строка — один пост: id, username автора, заголовок, текст и даты
+в ISO 8601. Посты читаются через iterator() пачками, поэтому память не
+растёт с размером базы. Файл загружается обратно командой import_posts:
+
+    python manage.py export_posts --output posts.jsonl
+    python manage.py import_posts posts.jsonl
+"""
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Выгружает посты в JSONL с постоянным потреблением памяти"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help="Файл для выгрузки, '-' — стандартный вывод")
+        parser.add_argument('--user', action='append', help="Выгрузить только посты этого пользователя (можно повторять)")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Размер пачки при чтении из базы")
+
+    def handle(self, *args, **options):
+        queryset = (
+            Post.objects.select_related('user')
+            .only('title', 'content', 'created_at', 'updated_at', 'user__username')
+            .order_by('id')
+        )
+        if options['user']:
+            queryset = queryset.filter(user__username__in=options['user'])
+
+        if options['output'] == '-':
+            self._export(queryset, sys.stdout, options['chunk_size'])
+            return
+        try:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                self._export(queryset, output, options['chunk_size'])
+        except OSError as error:
+            raise CommandError(f"Не удалось записать {options['output']}: {error}")
+
+    def _export(self, queryset, output, chunk_size: int) -> None:
+        started = time.perf_counter()
+        total = 0
+        for post in queryset.iterator(chunk_size=chunk_size):
+            output.write(json.dumps(serialize(post), ensure_ascii=False))
+            output.write('\n')
+            total += 1
+            if total % chunk_size == 0:
+                elapsed = time.perf_counter() - started
+                self.stderr.write(f"Выгружено {total} постов, {total / elapsed:.0f} постов/с")
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(f"Выгружено постов: {total} за {elapsed:.1f} с"))
+
+
+def serialize(post: Post) -> dict:
+    return {
+        'id': post.pk,
+        'username': post.user.username if post.user_id else None,
+        'title': post.title,
+        'content': post.content,
+        'created_at': post.created_at.isoformat(),
+        'updated_at': post.updated_at.isoformat(),
+    }
+
@@ -0,0 +1,137 @@
+"""
+Потоковая загрузка постов из JSON Lines (формат export_posts).
+
+Строки читаются по одной и сохраняются пачками: bulk_create с upsert
+по id внутри транзакции на пачку, поэтому повторная загрузка того же
+файла не создаёт дублей, а прерванную загрузку можно просто запустить
+снова. Авторы ищутся по username одним запросом на пачку. Записи без id
+создаются как новые посты.
+"""
+import json
+import sys
+import time
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog import stats
+from blog.models import Post
+from blog.signals import posts_bulk_changed
+
+UPSERT_FIELDS = ['user', 'title', 'content', 'rendered_html', 'excerpt', 'created_at', 'updated_at']
+
+
+class Command(BaseCommand):
+    help = "Загружает посты из JSONL пачками с upsert по id"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл JSONL, '-' — стандартный ввод")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Постов в одной транзакции")
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.started = time.perf_counter()
+        self.imported = 0
+        self.skipped = 0
+        self.missing_users = set()
+
+        if options['path'] == '-':
+            self._import(sys.stdin)
+        else:
+            try:
+                with open(options['path'], encoding='utf-8') as source:
+                    self._import(source)
+            except OSError as error:
+                raise CommandError(f"Не удалось прочитать {options['path']}: {error}")
+
+        # Статистику новых авторов обновляет posts_bulk_changed, но upsert мог
+        # перенести посты от прежних авторов, которых в файле нет
+        stats.reconcile()
+
+        elapsed = time.perf_counter() - self.started
+        if self.missing_users:
+            self.stderr.write(self.style.WARNING(
+                f"Пропущено постов: {self.skipped}, нет пользователей: {', '.join(sorted(self.missing_users)[:20])}"
+            ))
+        self.stderr.write(self.style.SUCCESS(f"Загружено постов: {self.imported} за {elapsed:.1f} с"))
+
+    def _import(self, source) -> None:
+        batch = []
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise CommandError(f"Строка {line_number}: некорректный JSON ({error})")
+            if not isinstance(record, dict) or not record.get('title') or 'content' not in record:
+                raise CommandError(f"Строка {line_number}: нужны поля title и content")
+            batch.append((line_number, record))
+            if len(batch) >= self.batch_size:
+                self._save(batch)
+                batch = []
+        if batch:
+            self._save(batch)
+
+    def _save(self, batch: list[tuple[int, dict]]) -> None:
+        # Кэш авторов на пачку: один запрос вместо запроса на каждую строку
+        usernames = {record['username'] for _, record in batch if record.get('username')}
+        users = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+
+        posts = []
+        now = timezone.now()
+        for line_number, record in batch:
+            username = record.get('username')
+            if username and username not in users:
+                self.missing_users.add(username)
+                self.skipped += 1
+                continue
+            post = Post(
+                id=record.get('id'),
+                user_id=users.get(username),
+                title=record['title'],
+                content=record['content'],
+                created_at=_parse_date(record.get('created_at'), line_number) or now,
+            )
+            post.updated_at = _parse_date(record.get('updated_at'), line_number) or post.created_at
+            post.render()
+            posts.append(post)
+        if not posts:
+            return
+
+        # auto_now_add и auto_now перезаписывают даты при вставке,
+        # поэтому даты из файла возвращаются вторым запросом
+        dates = [(post.created_at, post.updated_at) for post in posts]
+        with transaction.atomic():
+            Post.objects.bulk_create(
+                posts,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=UPSERT_FIELDS,
+            )
+            for post, (created_at, updated_at) in zip(posts, dates):
+                post.created_at, post.updated_at = created_at, updated_at
+            Post.objects.bulk_update(posts, ['created_at', 'updated_at'])
+            posts_bulk_changed.send(sender=Post, posts=posts)
+
+        self.imported += len(posts)
+        elapsed = time.perf_counter() - self.started
+        self.stderr.write(f"Загружено {self.imported} постов, {self.imported / elapsed:.0f} постов/с")
+
+
+def _parse_date(value: str | None, line_number: int) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f"Строка {line_number}: некорректная дата {value!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
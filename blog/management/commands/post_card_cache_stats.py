@@ -0,0 +1,25 @@
+"""Счётчики кэша карточек постов."""
+from django.core.management.base import BaseCommand
+
+from blog import fragments
+
+
+class Command(BaseCommand):
+    help = "Показывает попадания и промахи кэша карточек постов"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Обнулить счётчики")
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            fragments.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Счётчики обнулены"))
+            return
+        backend = fragments.get_cache().__class__.__name__
+        if backend == 'LocMemCache':
+            self.stdout.write(self.style.WARNING(
+                "Кэш в памяти процесса: счётчики воркеров отсюда не видны, "
+                "используйте DJANGO_CACHE=file или DJANGO_CACHE=db"
+            ))
+        for name, value in fragments.stats().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,31 @@
+"""Пересборка материализованных домашних лент (см. blog/timeline.py)."""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import timeline
+
+
+class Command(BaseCommand):
+    help = "Собирает домашние ленты заново из подписок и последних постов авторов"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', help="Пересобрать ленту только этого пользователя (можно повторять)")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(following__isnull=False).distinct().order_by('pk')
+        if options['user']:
+            users = users.filter(username__in=options['user'])
+        started = time.perf_counter()
+        rebuilt = entries = 0
+        for user in users.iterator():
+            # Каждая лента — отдельная короткая транзакция
+            with transaction.atomic():
+                entries += timeline.rebuild(user)
+            rebuilt += 1
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Пересобрано лент: {rebuilt}, записей: {entries} за {elapsed:.2f} с"
+        ))
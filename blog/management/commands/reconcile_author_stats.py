@@ -0,0 +1,25 @@
+"""Сверка денормализованной статистики авторов с их постами."""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from blog import stats
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает AuthorStats по постам и исправляет расхождения"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', help="Проверить только этого пользователя (можно повторять)")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Строк в одном INSERT")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['user']:
+            user_ids = list(User.objects.filter(username__in=options['user']).values_list('id', flat=True))
+        started = time.perf_counter()
+        fixed = stats.reconcile(user_ids, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        style = self.style.WARNING if fixed else self.style.SUCCESS
+        self.stdout.write(style(f"Исправлено записей: {fixed} за {elapsed:.2f} с"))
@@ -0,0 +1,43 @@
+"""Перерисовка сохранённого HTML и анонсов постов."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Заполняет rendered_html и excerpt у постов по их тексту"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Количество постов, обновляемых одним запросом",
+        )
+        parser.add_argument(
+            '--missing', action='store_true',
+            help="Обрабатывать только посты без сохранённого HTML",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.only('id', 'content').order_by('id')
+        if options['missing']:
+            queryset = queryset.filter(rendered_html='')
+
+        started = time.perf_counter()
+        total = 0
+        batch = []
+        for post in queryset.iterator(chunk_size=batch_size):
+            post.render()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, ['rendered_html', 'excerpt'])
+                total += len(batch)
+                batch = []
+        if batch:
+            Post.objects.bulk_update(batch, ['rendered_html', 'excerpt'])
+            total += len(batch)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Обработано постов: {total} за {elapsed:.2f} с"))
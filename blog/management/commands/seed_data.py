@@ -0,0 +1,131 @@
+"""Генерация синтетических пользователей и постов для бенчмарков."""
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog import search, stats
+from blog.models import Post
+
+WORDS = (
+    "пост блог текст день город время жизнь работа дом друг книга музыка "
+    "вечер утро дорога море лес кот собака идея проект код сервер база "
+    "данных запрос страница пользователь поиск лента новость история"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Создаёт N пользователей по M постов с заданным распределением длины текста"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help="Количество пользователей")
+        parser.add_argument('--posts', type=int, default=50, help="Среднее количество постов на пользователя")
+        parser.add_argument(
+            '--posts-skew', type=float, default=1.0,
+            help="Разброс числа постов (сигма логнормального распределения, 0 — у всех поровну)",
+        )
+        parser.add_argument('--content-median', type=int, default=600, help="Медианная длина поста в символах")
+        parser.add_argument(
+            '--content-sigma', type=float, default=1.0,
+            help="Сигма логнормального распределения длины поста",
+        )
+        parser.add_argument('--prefix', default='bench_', help="Префикс имён создаваемых пользователей")
+        parser.add_argument('--seed', type=int, default=42, help="Зерно генератора случайных чисел")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Размер пачки bulk_create")
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Сначала удалить пользователей с этим префиксом и их посты",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = options['prefix']
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=prefix).delete()
+            self.stdout.write(f"Удалено объектов: {deleted}")
+
+        # Хеш пароля считается один раз: PBKDF2 на каждого пользователя занял бы минуты
+        password = make_password('bench-password')
+        users = [
+            User(
+                username=f"{prefix}{number:06d}",
+                first_name=rng.choice(WORDS).capitalize(),
+                last_name=rng.choice(WORDS).capitalize(),
+                email=f"{prefix}{number:06d}@example.com",
+                password=password,
+                # Первый пользователь — администратор, чтобы бенчмарк мог открыть /admin/
+                is_staff=number == 0,
+                is_superuser=number == 0,
+            )
+            for number in range(options['users'])
+        ]
+        User.objects.bulk_create(users, batch_size=batch_size, ignore_conflicts=True)
+        users = list(User.objects.filter(username__startswith=prefix).order_by('id'))
+
+        now = timezone.now()
+        total_posts = 0
+        batch = []
+        for user in users:
+            count = self._posts_count(rng, options['posts'], options['posts_skew'])
+            for _ in range(count):
+                length = int(rng.lognormvariate(0, options['content_sigma']) * options['content_median'])
+                created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+                post = Post(
+                    user=user,
+                    title=' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 7))).capitalize(),
+                    content=self._content(rng, max(length, 1)),
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                post.render()
+                batch.append(post)
+                if len(batch) >= batch_size:
+                    total_posts += self._save(batch)
+                    batch = []
+        if batch:
+            total_posts += self._save(batch)
+
+        self.stdout.write("Пересобираем поисковый индекс и статистику авторов...")
+        search.rebuild()
+        stats.reconcile()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано пользователей: {len(users)}, постов: {total_posts} за {elapsed:.1f} с"
+        ))
+
+    @staticmethod
+    def _posts_count(rng: random.Random, mean: int, skew: float) -> int:
+        if skew <= 0:
+            return mean
+        # Логнормальное распределение с заданным средним: немного «тяжёлых» авторов
+        return int(rng.lognormvariate(-skew * skew / 2, skew) * mean)
+
+    @staticmethod
+    def _content(rng: random.Random, length: int) -> str:
+        paragraphs, size = [], 0
+        while size < length:
+            paragraph = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(10, 60))).capitalize() + '.'
+            paragraphs.append(paragraph)
+            size += len(paragraph) + 2
+        return '\n\n'.join(paragraphs)[:length]
+
+    @staticmethod
+    def _save(batch: list[Post]) -> int:
+        # auto_now_add и auto_now перезаписывают даты при вставке,
+        # поэтому сгенерированные даты возвращаются вторым запросом
+        dates = [post.created_at for post in batch]
+        with transaction.atomic():
+            Post.objects.bulk_create(batch)
+            for post, created_at in zip(batch, dates):
+                post.created_at = post.updated_at = created_at
+            Post.objects.bulk_update(batch, ['created_at', 'updated_at'])
+        return len(batch)
@@ -0,0 +1,136 @@
+"""
+Нагрузочная проверка одновременных чтений и записей в SQLite.
+
+Писатели в отдельных процессах в цикле читают и создают посты в одной
+транзакции, как это делают view редактирования (по умолчанию транзакции
+откатываются, так что база не засоряется, но блокировка записи берётся
+по-настоящему). Читатели в это время выбирают страницы постов через
+алиас чтения. В конце печатается пропускная способность, задержки
+и число ошибок "database is locked".
+
+Сравнение режимов:
+    DJANGO_DB_MODE=dev python manage.py sqlite_stress
+    DJANGO_DB_MODE=production python manage.py sqlite_stress
+"""
+import multiprocessing
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from blog.models import Post
+from core.routers import READ_ALIAS
+
+
+class Command(BaseCommand):
+    help = "Проверяет, что читатели и писатели SQLite не блокируют друг друга"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help="Количество процессов-читателей")
+        parser.add_argument('--writers', type=int, default=2, help="Количество процессов-писателей")
+        parser.add_argument('--duration', type=float, default=5.0, help="Длительность теста в секундах")
+        parser.add_argument(
+            '--write-hold', type=float, default=0.01,
+            help="Сколько секунд писатель держит открытую транзакцию",
+        )
+        parser.add_argument(
+            '--commit', action='store_true',
+            help="Фиксировать записи вместо отката (созданные посты удаляются в конце)",
+        )
+
+    def handle(self, *args, **options):
+        read_alias = READ_ALIAS if READ_ALIAS in settings.DATABASES else 'default'
+        deadline = time.time() + options['duration']
+        # Отдельные процессы, как воркеры gunicorn: потоки упирались бы в GIL
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        connections.close_all()
+
+        processes = [
+            context.Process(target=_reader, args=(queue, read_alias, deadline))
+            for _ in range(options['readers'])
+        ]
+        processes += [
+            context.Process(target=_writer, args=(queue, number, deadline, options['write_hold'], options['commit']))
+            for number in range(options['writers'])
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+
+        results = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        created_ids = []
+        for _ in processes:
+            kind, latencies, error_count, ids = queue.get()
+            results[kind].extend(latencies)
+            errors[kind] += error_count
+            created_ids.extend(ids)
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        if created_ids:
+            Post.objects.filter(pk__in=created_ids).delete()
+
+        self.stdout.write(
+            f"Режим базы: {settings.DB_MODE}, алиас чтения: {read_alias}, "
+            f"читателей: {options['readers']}, писателей: {options['writers']}, {elapsed:.1f} с"
+        )
+        for kind, title in (('read', "Чтения"), ('write', "Записи")):
+            latencies = sorted(results[kind])
+            line = f"{title}: {len(latencies)} ({len(latencies) / elapsed:.0f}/с), ошибок блокировки: {errors[kind]}"
+            if latencies:
+                p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+                line += (
+                    f", p50 {statistics.median(latencies) * 1000:.1f} мс"
+                    f", p95 {p95 * 1000:.1f} мс, max {latencies[-1] * 1000:.1f} мс"
+                )
+            self.stdout.write(line)
+
+        if errors['read'] or errors['write']:
+            self.stdout.write(self.style.ERROR("Были ошибки блокировки базы"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Ошибок блокировки нет"))
+
+
+def _reader(queue, read_alias: str, deadline: float) -> None:
+    latencies, error_count = [], 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            list(Post.objects.using(read_alias).defer('content').order_by('-created_at')[:20])
+        except OperationalError:
+            error_count += 1
+        else:
+            latencies.append(time.perf_counter() - started)
+    connections.close_all()
+    queue.put(('read', latencies, error_count, []))
+
+
+def _writer(queue, number: int, deadline: float, hold: float, commit: bool) -> None:
+    latencies, error_count, created_ids = [], 0, []
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(using='default'):
+                # Чтение перед записью: в режиме DEFERRED два таких писателя
+                # не могут повысить блокировку и один сразу получает SQLITE_BUSY
+                Post.objects.using('default').filter(title__startswith='sqlite_stress').exists()
+                post = Post.objects.using('default').create(
+                    title=f"sqlite_stress {number}",
+                    content="Нагрузочный тест " * 20,
+                )
+                time.sleep(hold)
+                if commit:
+                    created_ids.append(post.pk)
+                else:
+                    transaction.set_rollback(True, using='default')
+        except OperationalError:
+            error_count += 1
+        else:
+            latencies.append(time.perf_counter() - started)
+    connections.close_all()
+    queue.put(('write', latencies, error_count, created_ids))
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import migrations
+
+CREATE_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blog_search USING fts5(
+        user_id UNINDEXED,
+        username,
+        name,
+        title,
+        content,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+
+# rowid = id * 2 для пользователей и id * 2 + 1 для постов (см. blog/search.py)
+FILL_USERS_SQL = """
+    INSERT INTO blog_search (rowid, user_id, username, name)
+    SELECT id * 2, id, username, trim(first_name || ' ' || last_name || ' ' || email)
+    FROM auth_user
+"""
+FILL_POSTS_SQL = """
+    INSERT INTO blog_search (rowid, user_id, title, content)
+    SELECT id * 2 + 1, user_id, title, content
+    FROM blog_post WHERE user_id IS NOT NULL
+"""
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE_SQL)
+    schema_editor.execute(FILL_USERS_SQL)
+    schema_editor.execute(FILL_POSTS_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS blog_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_post_updated_at_post_user_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
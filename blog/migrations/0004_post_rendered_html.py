@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:43
+
+from django.db import migrations, models
+
+from blog.rendering import make_excerpt, render_html
+
+
+def render_existing_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('id', 'content').iterator(chunk_size=500):
+        post.rendered_html = render_html(post.content)
+        post.excerpt = make_excerpt(post.content)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ['rendered_html', 'excerpt'])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ['rendered_html', 'excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=300, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='rendered_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='HTML текста поста'),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:07
+
+import blog.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompressionDictionary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('algorithm', models.CharField(choices=[('zlib', 'zlib'), ('zstd', 'zstd')], max_length=10, verbose_name='Алгоритм')),
+                ('data', models.BinaryField(verbose_name='Словарь')),
+                ('samples', models.PositiveIntegerField(default=0, verbose_name='Постов в выборке')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Словарь сжатия',
+                'verbose_name_plural': 'Словари сжатия',
+            },
+        ),
+        # Колонка остаётся text: SQLite хранит в ней и строки, и BLOB.
+        # Без SeparateDatabaseAndState SQLite пересоздал бы всю таблицу
+        # постов; существующие тексты сжимает compress_post_content.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='post',
+                    name='content',
+                    field=blog.fields.CompressedTextField(verbose_name='Текст поста'),
+                ),
+            ],
+        ),
+    ]
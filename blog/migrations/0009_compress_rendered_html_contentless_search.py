@@ -0,0 +1,69 @@
+import blog.fields
+from django.db import migrations
+
+# Прежняя таблица поиска со своей копией текстов (0003_search_index)
+OLD_CREATE_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blog_search USING fts5(
+        user_id UNINDEXED,
+        username,
+        name,
+        title,
+        content,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+OLD_FILL_USERS_SQL = """
+    INSERT INTO blog_search (rowid, user_id, username, name)
+    SELECT id * 2, id, username, trim(first_name || ' ' || last_name || ' ' || email)
+    FROM auth_user
+"""
+
+
+def rebuild_search_index(apps, schema_editor):
+    """Contentless-индекс и таблица проиндексированных значений (см. blog/search.py)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from blog import search
+
+    search.rebuild()
+
+
+def restore_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from blog import compression
+
+    schema_editor.execute("DROP TABLE IF EXISTS blog_search")
+    schema_editor.execute("DROP TABLE IF EXISTS blog_search_docs")
+    schema_editor.execute(OLD_CREATE_TABLE_SQL)
+    schema_editor.execute(OLD_FILL_USERS_SQL)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT id, user_id, title, content FROM blog_post WHERE user_id IS NOT NULL")
+        rows = [
+            (post_id * 2 + 1, user_id, title, compression.decompress(content) if isinstance(content, bytes) else content)
+            for post_id, user_id, title, content in cursor.fetchall()
+        ]
+        cursor.executemany("INSERT INTO blog_search (rowid, user_id, title, content) VALUES (%s, %s, %s, %s)", rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_follow_timeline'),
+    ]
+
+    operations = [
+        # Колонка остаётся text, как у content в 0007: старые строки
+        # сжимает compress_post_content
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='post',
+                    name='rendered_html',
+                    field=blog.fields.CompressedTextField(blank=True, default='', editable=False, verbose_name='HTML текста поста'),
+                ),
+            ],
+        ),
+        migrations.RunPython(rebuild_search_index, restore_search_index),
+    ]
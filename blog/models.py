@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from .fields import CompressedTextField
+from .rendering import EXCERPT_LENGTH, make_excerpt, render_html
+
 class Post(models.Model):
     """Пост в блоге."""
     user = models.ForeignKey(
@@ -12,7 +15,10 @@ class Post(models.Model):
         blank=True
     )
     title = models.CharField("Заголовок", max_length=200)
-    content = models.TextField("Текст поста")
+    # На SQLite длинные тексты и их HTML хранятся сжатыми, см. blog/compression.py
+    content = CompressedTextField("Текст поста")
+    rendered_html = CompressedTextField("HTML текста поста", blank=True, default='', editable=False)
+    excerpt = models.CharField("Анонс", max_length=EXCERPT_LENGTH, blank=True, default='', editable=False)
     created_at = models.DateTimeField("Дата и время создания", auto_now_add=True)
     updated_at = models.DateTimeField("Дата и время обновления", auto_now=True)
 
@@ -22,7 +28,142 @@ class Post(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=['user', '-created_at']),
+            # Общий список по дате (админка): обратный проход даёт
+            # ORDER BY created_at DESC, id DESC без сортировки
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self) -> str:
         return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Автор на момент загрузки: при переносе поста к другому автору
+        # пересчитывается статистика обоих (см. blog/signals.py)
+        instance._loaded_user_id = instance.__dict__.get('user_id')
+        return instance
+
+    def render(self) -> None:
+        """Заполняет HTML и анонс по текущему тексту поста."""
+        self.rendered_html = render_html(self.content)
+        self.excerpt = make_excerpt(self.content)
+
+    def save(self, *args, **kwargs) -> None:
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.render()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'rendered_html', 'excerpt'}
+        super().save(*args, **kwargs)
+        # Обработчики post_save уже отработали и видели прежнего автора
+        self._loaded_user_id = self.user_id
+
+
+class AuthorStats(models.Model):
+    """
+    Денормализованная активность автора: число постов, дата последнего
+    и число подписчиков.
+
+    Поддерживается сигналами в той же транзакции, что и изменение поста
+    или подписки (см. blog/stats.py), и чинится командой
+    reconcile_author_stats.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+        verbose_name="Автор",
+    )
+    post_count = models.PositiveIntegerField("Количество постов", default=0)
+    last_post_at = models.DateTimeField("Дата последнего поста", null=True, blank=True)
+    follower_count = models.PositiveIntegerField("Количество подписчиков", default=0)
+
+    class Meta:
+        verbose_name = "Статистика автора"
+        verbose_name_plural = "Статистика авторов"
+        indexes = [
+            models.Index(fields=['-post_count']),
+            models.Index(fields=['-last_post_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.post_count}"
+
+
+class CompressionDictionary(models.Model):
+    """
+    Словарь для сжатия текстов постов, обученный на существующих постах.
+
+    Сжатое значение ссылается на словарь по id, поэтому словари не
+    изменяются и не удаляются; новые записи сжимаются последним.
+    """
+    algorithm = models.CharField("Алгоритм", max_length=10, choices=[('zlib', 'zlib'), ('zstd', 'zstd')])
+    data = models.BinaryField("Словарь")
+    samples = models.PositiveIntegerField("Постов в выборке", default=0)
+    created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Словарь сжатия"
+        verbose_name_plural = "Словари сжатия"
+
+    def __str__(self) -> str:
+        return f"{self.algorithm} #{self.pk}"
+
+
+class Follow(models.Model):
+    """Подписка пользователя на автора."""
+    follower = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name="Подписчик",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='followers',
+        verbose_name="Автор",
+    )
+    created_at = models.DateTimeField("Дата подписки", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Подписка"
+        verbose_name_plural = "Подписки"
+        constraints = [
+            models.UniqueConstraint(fields=['follower', 'author'], name='blog_follow_unique'),
+            models.CheckConstraint(condition=~models.Q(follower=models.F('author')), name='blog_follow_not_self'),
+        ]
+        indexes = [
+            # Раскладка поста по лентам перебирает подписчиков автора
+            models.Index(fields=['author', 'follower']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.follower_id} → {self.author_id}"
+
+
+class TimelineEntry(models.Model):
+    """
+    Пост в материализованной домашней ленте пользователя (blog/timeline.py).
+
+    Дата поста скопирована, чтобы страница ленты читалась по индексу
+    (owner, -created_at, post) без соединения с таблицей постов.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name="Владелец ленты")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+', verbose_name="Пост")
+    created_at = models.DateTimeField("Дата поста")
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи лент"
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'post'], name='blog_timeline_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-created_at', 'post']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.owner_id}: {self.post_id}"
@@ -0,0 +1,84 @@
+"""Курсорная (keyset) пагинация постов по паре (created_at, id)."""
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+
+def get_page_size() -> int:
+    """Размер страницы ленты постов."""
+    return getattr(settings, 'BLOG_PAGE_SIZE', 20)
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    """Кодирует позицию последнего показанного поста в строку для URL."""
+    raw = f"{created_at.isoformat()}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Разбирает курсор. При некорректном значении бросает ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, post_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Некорректный курсор") from exc
+
+
+def after_cursor(queryset: QuerySet, cursor: str | None, id_field: str = 'id') -> QuerySet:
+    """
+    Упорядочивает выборку по (created_at, id) и отсекает всё до курсора.
+    id_field — поле с id поста (у записей ленты это post_id).
+    """
+    # Индекс (user, -created_at) в SQLite неявно продолжается rowid по
+    # возрастанию, поэтому при равных датах сортируем по id в прямом порядке:
+    # так и сортировка, и диапазон целиком идут по индексу без временного B-дерева.
+    queryset = queryset.order_by('-created_at', id_field)
+    if not cursor:
+        return queryset
+    created_at, post_id = decode_cursor(cursor)
+    return queryset.filter(created_at__lte=created_at).exclude(
+        created_at=created_at, **{f'{id_field}__lte': post_id}
+    )
+
+
+def paginate(queryset: QuerySet, cursor: str | None, page_size: int | None = None) -> tuple[list, str | None]:
+    """
+    Возвращает страницу постов после курсора и курсор следующей страницы.
+
+    Выбирается на одну запись больше размера страницы, чтобы узнать,
+    есть ли продолжение, без отдельного COUNT(*).
+    """
+    page_size = page_size or get_page_size()
+    items = list(after_cursor(queryset, cursor)[:page_size + 1])
+    return _split_page(items, page_size)
+
+
+async def apaginate(queryset: QuerySet, cursor: str | None, page_size: int | None = None) -> tuple[list, str | None]:
+    """Асинхронный вариант paginate()."""
+    page_size = page_size or get_page_size()
+    items = [item async for item in after_cursor(queryset, cursor)[:page_size + 1]]
+    return _split_page(items, page_size)
+
+
+def page_context(posts: list, next_cursor: str | None, page_url: str, fragment_url: str) -> dict:
+    """
+    Контекст одной страницы ленты: посты и ссылки на следующую страницу
+    (полную и HTML-фрагмент для script.js).
+    """
+    context = {"posts": posts, "next_page_url": None, "next_fragment_url": None}
+    if next_cursor:
+        context["next_page_url"] = f"{page_url}?cursor={next_cursor}"
+        context["next_fragment_url"] = f"{fragment_url}?cursor={next_cursor}"
+    return context
+
+
+def _split_page(items: list, page_size: int) -> tuple[list, str | None]:
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
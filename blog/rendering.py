@@ -0,0 +1,16 @@
+"""Подготовка HTML и анонса поста в момент записи."""
+from django.template.defaultfilters import linebreaks_filter
+from django.utils.text import Truncator
+
+# Длина анонса поста в символах
+EXCERPT_LENGTH = 300
+
+
+def render_html(content: str) -> str:
+    """HTML текста поста: то же, что фильтр ``linebreaks`` в шаблоне."""
+    return str(linebreaks_filter(content, autoescape=True))
+
+
+def make_excerpt(content: str) -> str:
+    """Короткий текстовый анонс поста без переносов строк."""
+    return Truncator(' '.join(content.split())).chars(EXCERPT_LENGTH)
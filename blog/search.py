@@ -0,0 +1,440 @@
+"""
+Полнотекстовый поиск пользователей и постов на SQLite FTS5.
+
+Все документы лежат в одной виртуальной таблице ``blog_search``: строки
+пользователей (username, имя и email) и строки постов (заголовок и текст).
+Тип и id документа закодированы в rowid, поэтому обновление и удаление
+строки — это поиск по первичному ключу, а не сканирование таблицы.
+
+Таблица contentless (content=''): FTS5 хранит только индекс, без своей
+копии текстов. Удалить строку из такого индекса можно, только передав
+те же значения, что были проиндексированы, поэтому они лежат в обычной
+таблице ``blog_search_docs`` вместе с автором документа — текст поста
+сжат так же, как в blog_post (blog/compression.py). Фрагменты для
+выдачи строятся по этому тексту в Python: snippet() без содержимого
+не работает.
+
+Индекс поддерживается сигналами (см. blog/signals.py) и пересобирается
+командой ``manage.py rebuild_search_index``. На других СУБД поиск
+откатывается к обычным запросам ``icontains``.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from . import compression
+from .models import Post
+
+TABLE = 'blog_search'
+DOCS_TABLE = 'blog_search_docs'
+
+# Веса колонок для bm25(): username, name, title, content
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+CREATE_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(
+        username,
+        name,
+        title,
+        content,
+        content = '',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+CREATE_DOCS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {DOCS_TABLE} (
+        id integer NOT NULL PRIMARY KEY,
+        user_id integer NOT NULL,
+        username text,
+        name text,
+        title text,
+        content text
+    )
+"""
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {TABLE}"
+DROP_DOCS_TABLE_SQL = f"DROP TABLE IF EXISTS {DOCS_TABLE}"
+
+_COLUMNS = 'username, name, title, content'
+
+# Длина фрагмента в словах, как у snippet(..., 16)
+SNIPPET_TOKENS = 16
+
+_KIND_USER = 0
+_KIND_POST = 1
+
+# Маркеры подсветки в snippet(): управляющие символы не встречаются в тексте,
+# поэтому их можно безопасно заменить на теги уже после экранирования.
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@dataclass
+class SearchResult:
+    """Найденный пользователь и фрагмент подходящего поста."""
+    user: User
+    snippet: SafeString | None = None
+
+
+def get_page_size() -> int:
+    """Количество результатов на одной странице поиска."""
+    return getattr(settings, 'SEARCH_PAGE_SIZE', 20)
+
+
+def is_available(using: str | None = None) -> bool:
+    """Доступен ли FTS5-индекс для базы данных."""
+    using = using or router.db_for_read(Post)
+    return connections[using].vendor == 'sqlite'
+
+
+def _rowid(kind: int, object_id: int) -> int:
+    return object_id * 2 + kind
+
+
+def _write_connection():
+    return connections[router.db_for_write(Post)]
+
+
+def build_match_query(text: str) -> str | None:
+    """
+    Превращает пользовательский ввод в безопасное выражение MATCH.
+
+    Каждое слово ищется по префиксу, все слова должны встретиться
+    в документе. Синтаксис FTS5 из ввода не интерпретируется.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def post_filter(text: str, using: str | None = None) -> Q | None:
+    """
+    Условие для выборки постов, подходящих под запрос: совпадение
+    в заголовке или тексте поста либо в username и имени автора.
+
+    На SQLite условие — подзапросы к FTS5-индексу, без сканирования
+    текстов постов. None, если в запросе нет ни одного слова.
+    """
+    if not is_available(using):
+        return Q(title__icontains=text) | Q(content__icontains=text) | Q(user__username__icontains=text)
+    match = build_match_query(text)
+    if match is None:
+        return None
+    posts = RawSQL(
+        f"SELECT rowid / 2 FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid %% 2 = {_KIND_POST}",
+        [match],
+    )
+    authors = RawSQL(
+        f"SELECT rowid / 2 FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid %% 2 = {_KIND_USER}",
+        [match],
+    )
+    return Q(pk__in=posts) | Q(user_id__in=authors)
+
+
+def index_user(user: User) -> None:
+    """Добавляет или обновляет строку пользователя в индексе."""
+    connection = _write_connection()
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        _replace(cursor, [_user_document(user)])
+
+
+def index_post(post: Post) -> None:
+    """Добавляет или обновляет строку поста в индексе."""
+    index_posts([post])
+
+
+def index_posts(posts: list[Post]) -> None:
+    """Добавляет или обновляет строки постов в индексе."""
+    connection = _write_connection()
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        _replace(cursor, [_post_document(post) for post in posts if post.user_id is not None])
+        for post in posts:
+            if post.user_id is None:
+                _delete(cursor, _rowid(_KIND_POST, post.pk))
+
+
+def remove_user(user_id: int) -> None:
+    """Удаляет пользователя из индекса."""
+    _remove(_rowid(_KIND_USER, user_id))
+
+
+def remove_post(post_id: int) -> None:
+    """Удаляет пост из индекса."""
+    _remove(_rowid(_KIND_POST, post_id))
+
+
+def _remove(rowid: int) -> None:
+    connection = _write_connection()
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        _delete(cursor, rowid)
+
+
+def _user_document(user: User) -> tuple:
+    name = ' '.join(filter(None, [user.first_name, user.last_name, user.email]))
+    return (_rowid(_KIND_USER, user.pk), user.pk, user.username, name, None, None)
+
+
+def _post_document(post: Post) -> tuple:
+    """
+    Строка blog_search_docs для поста. Уже сжатый текст из базы берётся
+    как есть, без распаковки и повторного сжатия.
+    """
+    stored = post.__dict__.get('content')
+    if isinstance(stored, compression.Compressed):
+        stored = bytes(stored)
+    else:
+        stored = compression.compress(post.content)
+    return (_rowid(_KIND_POST, post.pk), post.user_id, None, None, post.title, stored)
+
+
+def _text(stored: str | bytes | None) -> str | None:
+    return compression.decompress(stored) if isinstance(stored, bytes) else stored
+
+
+def _replace(cursor, documents: list[tuple]) -> None:
+    """Заменяет документы в индексе; неизменившиеся пропускаются."""
+    if not documents:
+        return
+    placeholders = ', '.join(['%s'] * len(documents))
+    cursor.execute(
+        f"SELECT id, user_id, username, name, title, content FROM {DOCS_TABLE} WHERE id IN ({placeholders})",
+        [document[0] for document in documents],
+    )
+    indexed = {row[0]: tuple(row) for row in cursor.fetchall()}
+    deleted, inserted, stored = [], [], []
+    for document in documents:
+        old = indexed.get(document[0])
+        if old == document:
+            continue
+        if old is not None:
+            deleted.append(('delete', old[0], *old[2:5], _text(old[5])))
+        inserted.append((document[0], *document[2:5], _text(document[5])))
+        stored.append(document)
+    if deleted:
+        cursor.executemany(f"INSERT INTO {TABLE} ({TABLE}, rowid, {_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s)", deleted)
+    if inserted:
+        cursor.executemany(f"INSERT INTO {TABLE} (rowid, {_COLUMNS}) VALUES (%s, %s, %s, %s, %s)", inserted)
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {DOCS_TABLE} (id, user_id, {_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s)",
+            stored,
+        )
+
+
+def _delete(cursor, rowid: int) -> None:
+    cursor.execute(f"SELECT {_COLUMNS} FROM {DOCS_TABLE} WHERE id = %s", [rowid])
+    old = cursor.fetchone()
+    if old is None:
+        return
+    cursor.execute(
+        f"INSERT INTO {TABLE} ({TABLE}, rowid, {_COLUMNS}) VALUES ('delete', %s, %s, %s, %s, %s)",
+        [rowid, *old[:3], _text(old[3])],
+    )
+    cursor.execute(f"DELETE FROM {DOCS_TABLE} WHERE id = %s", [rowid])
+
+
+def _insert_all(cursor, documents: list[tuple]) -> None:
+    cursor.executemany(
+        f"INSERT INTO {TABLE} (rowid, {_COLUMNS}) VALUES (%s, %s, %s, %s, %s)",
+        [(document[0], *document[2:5], _text(document[5])) for document in documents],
+    )
+    cursor.executemany(
+        f"INSERT INTO {DOCS_TABLE} (id, user_id, {_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s)",
+        documents,
+    )
+
+
+def rebuild(batch_size: int = 1000) -> tuple[int, int]:
+    """Полностью пересобирает индекс. Возвращает число пользователей и постов."""
+    connection = _write_connection()
+    users = posts = 0
+    if connection.vendor != 'sqlite':
+        return users, posts
+    # Пересборка в одной транзакции: читатели до её окончания видят старый индекс
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(DROP_TABLE_SQL)
+        cursor.execute(DROP_DOCS_TABLE_SQL)
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(CREATE_DOCS_TABLE_SQL)
+
+        documents = []
+        for user in User.objects.only('username', 'first_name', 'last_name', 'email').iterator(chunk_size=batch_size):
+            documents.append(_user_document(user))
+            users += 1
+            if len(documents) >= batch_size:
+                _insert_all(cursor, documents)
+                documents = []
+        if documents:
+            _insert_all(cursor, documents)
+
+        documents = []
+        queryset = Post.objects.filter(user__isnull=False).only('user_id', 'title', 'content')
+        for post in queryset.iterator(chunk_size=batch_size):
+            documents.append(_post_document(post))
+            posts += 1
+            if len(documents) >= batch_size:
+                _insert_all(cursor, documents)
+                documents = []
+        if documents:
+            _insert_all(cursor, documents)
+
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return users, posts
+
+
+def search_users(text: str, page: int = 1, page_size: int | None = None) -> tuple[list[SearchResult], bool]:
+    """
+    Ищет пользователей по их данным и по их постам.
+
+    Пользователи упорядочены по лучшему bm25 среди их документов.
+    Возвращает страницу результатов и признак наличия следующей страницы.
+    """
+    page_size = page_size or get_page_size()
+    offset = (max(page, 1) - 1) * page_size
+
+    using = router.db_for_read(Post)
+    if not is_available(using):
+        return _fallback_search(text, offset, page_size)
+
+    match = build_match_query(text)
+    if match is None:
+        return [], False
+
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    with connections[using].cursor() as cursor:
+        # Вспомогательные функции FTS5 нельзя вызывать внутри агрегатов,
+        # поэтому ранги сначала материализуются в CTE.
+        cursor.execute(
+            f"""
+            WITH matches AS MATERIALIZED (
+                SELECT rowid AS doc_id, bm25({TABLE}, {weights}) AS score
+                FROM {TABLE} WHERE {TABLE} MATCH %s
+            )
+            SELECT docs.user_id FROM matches
+            JOIN {DOCS_TABLE} AS docs ON docs.id = matches.doc_id
+            GROUP BY docs.user_id
+            ORDER BY MIN(score), docs.user_id
+            LIMIT %s OFFSET %s
+            """,
+            [match, page_size + 1, offset],
+        )
+        user_ids = [row[0] for row in cursor.fetchall()]
+    has_next = len(user_ids) > page_size
+    user_ids = user_ids[:page_size]
+    if not user_ids:
+        return [], has_next
+
+    users = User.objects.using(using).select_related('post_stats').in_bulk(user_ids)
+    snippets = _post_snippets(using, match, user_ids, _fold_tokens(text))
+    results = [
+        SearchResult(user=users[user_id], snippet=snippets.get(user_id))
+        for user_id in user_ids if user_id in users
+    ]
+    return results, has_next
+
+
+def _post_snippets(using: str, match: str, user_ids: list[int], prefixes: tuple[str, ...]) -> dict[int, SafeString]:
+    """Лучший фрагмент текста поста для каждого из найденных пользователей."""
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    with connections[using].cursor() as cursor:
+        # Фрагмент строится только для одного лучшего по рангу поста
+        # каждого пользователя
+        cursor.execute(
+            f"""
+            WITH ranked AS MATERIALIZED (
+                SELECT rowid AS doc_id, rank AS score
+                FROM {TABLE}
+                WHERE {TABLE} MATCH %s AND rowid %% 2 = {_KIND_POST}
+            )
+            SELECT user_id, title, content FROM (
+                SELECT docs.user_id, docs.title, docs.content,
+                       ROW_NUMBER() OVER (PARTITION BY docs.user_id ORDER BY ranked.score) AS position
+                FROM ranked JOIN {DOCS_TABLE} AS docs ON docs.id = ranked.doc_id
+                WHERE docs.user_id IN ({placeholders})
+            ) WHERE position = 1
+            """,
+            [match, *user_ids],
+        )
+        rows = cursor.fetchall()
+    snippets = {}
+    for user_id, title, content in rows:
+        snippet = _snippet(_text(content) or '', prefixes) or _snippet(title or '', prefixes)
+        if snippet:
+            snippets[user_id] = _highlight(snippet)
+    return snippets
+
+
+def _fold(text: str) -> str:
+    """Нижний регистр без диакритики — как у токенизатора unicode61 remove_diacritics."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _fold_tokens(text: str) -> tuple[str, ...]:
+    return tuple(_fold(token) for token in _TOKEN_RE.findall(text))
+
+
+def _snippet(text: str, prefixes: tuple[str, ...], size: int = SNIPPET_TOKENS) -> str | None:
+    """
+    Фрагмент текста из size слов с наибольшим числом совпадений, слова
+    отмечены маркерами _MARK_START/_MARK_END. None, если совпадений нет.
+    """
+    tokens = list(_TOKEN_RE.finditer(text))
+    hits = [index for index, token in enumerate(tokens) if _fold(token.group()).startswith(prefixes)]
+    if not hits:
+        return None
+    # Окно начинается чуть раньше одного из совпадений
+    start = max(
+        (max(hit - 2, 0) for hit in hits),
+        key=lambda begin: (sum(begin <= hit < begin + size for hit in hits), -begin),
+    )
+    end = min(start + size, len(tokens))
+    marked = set(hits)
+    parts = ['…' if start > 0 else '']
+    position = tokens[start].start()
+    for index in range(start, end):
+        token = tokens[index]
+        parts.append(text[position:token.start()])
+        if index in marked:
+            parts.append(f'{_MARK_START}{token.group()}{_MARK_END}')
+        else:
+            parts.append(token.group())
+        position = token.end()
+    if end < len(tokens):
+        parts.append('…')
+    return ''.join(parts)
+
+
+def _highlight(snippet: str) -> SafeString:
+    """Экранирует фрагмент и превращает маркеры совпадений в <mark>."""
+    html = escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+    return mark_safe(html)
+
+
+def _fallback_search(text: str, offset: int, page_size: int) -> tuple[list[SearchResult], bool]:
+    """Поиск без FTS5 для СУБД, отличных от SQLite."""
+    users = list(
+        User.objects.select_related('post_stats').filter(
+            Q(username__icontains=text) |
+            Q(first_name__icontains=text) |
+            Q(last_name__icontains=text) |
+            Q(email__icontains=text)
+        ).order_by('username')[offset:offset + page_size + 1]
+    )
+    return [SearchResult(user=user) for user in users[:page_size]], len(users) > page_size
@@ -0,0 +1,230 @@
+"""Обработчики сигналов моделей блога."""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from core import page_cache
+from jobs.queue import enqueue
+from . import autocomplete, feeds, fragments, search, stats, tasks, timeline  # noqa: F401 - регистрация задач
+from .conditional import author_page_group
+from .models import Follow, Post
+
+# Массовое изменение постов в обход save() (bulk_create / bulk_update),
+# для которого post_save не отправляется. Аргументы: posts — список
+# сохранённых экземпляров Post; created — новые посты из posts, если
+# отправитель их различает (None — не различает, все посты считаются
+# новыми). Отправляется внутри той же транзакции, поэтому статистика
+# авторов и задачи (blog/tasks.py) фиксируются вместе с постами.
+posts_bulk_changed = Signal()
+
+
+def _only_last_login(update_fields) -> bool:
+    """Вход в систему сохраняет только last_login: страницы и подсказки не меняются."""
+    return update_fields is not None and set(update_fields) <= {'last_login'}
+
+
+@receiver(post_save, sender=User, dispatch_uid='blog_search_index_user')
+def index_user(sender, instance: User, raw: bool = False, update_fields=None, **kwargs) -> None:
+    """Обновляет пользователя в поисковом индексе."""
+    if raw or _only_last_login(update_fields):
+        return
+    search.index_user(instance)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='blog_search_remove_user')
+def remove_user(sender, instance: User, **kwargs) -> None:
+    """Удаляет пользователя из поискового индекса."""
+    search.remove_user(instance.pk)
+
+
+def _enqueue_sync_post(post_id: int) -> None:
+    enqueue('blog.sync_post', {'post_id': post_id}, key=f'blog.sync_post:{post_id}')
+
+
+def _enqueue_author_changed(user_ids) -> None:
+    for user_id in set(user_ids) - {None}:
+        enqueue('blog.author_changed', {'user_id': user_id}, key=f'blog.author_changed:{user_id}')
+
+
+@receiver(post_save, sender=Post, dispatch_uid='blog_search_index_post')
+def index_post(sender, instance: Post, raw: bool = False, **kwargs) -> None:
+    """Ставит задачу обновить пост в поисковом индексе."""
+    if not raw:
+        _enqueue_sync_post(instance.pk)
+
+
+@receiver(post_delete, sender=Post, dispatch_uid='blog_search_remove_post')
+def remove_post(sender, instance: Post, **kwargs) -> None:
+    """Ставит задачу удалить пост из поискового индекса."""
+    _enqueue_sync_post(instance.pk)
+
+
+@receiver(pre_save, sender=Post, dispatch_uid='blog_post_card_remember')
+def remember_card_version(sender, instance: Post, **kwargs) -> None:
+    """Запоминает updated_at до сохранения: по нему строился ключ карточки."""
+    instance._card_updated_at = instance.updated_at if instance.pk else None
+
+
+@receiver(post_save, sender=Post, dispatch_uid='blog_post_card_evict_saved')
+def evict_saved_card(sender, instance: Post, raw: bool = False, **kwargs) -> None:
+    """Удаляет из кэша карточку прежней версии поста."""
+    if not raw:
+        fragments.evict(instance.pk, getattr(instance, '_card_updated_at', None))
+
+
+@receiver(post_delete, sender=Post, dispatch_uid='blog_post_card_evict_deleted')
+def evict_deleted_card(sender, instance: Post, **kwargs) -> None:
+    """Удаляет из кэша карточку удалённого поста."""
+    fragments.evict(instance.pk, instance.updated_at)
+
+
+@receiver(posts_bulk_changed, sender=Post, dispatch_uid='blog_search_index_bulk')
+def index_bulk_posts(sender, posts: list[Post], **kwargs) -> None:
+    """Ставит одну задачу обновить массово изменённые посты в поисковом индексе."""
+    if posts:
+        enqueue('blog.sync_posts', {'post_ids': [post.pk for post in posts]})
+
+
+@receiver(post_save, sender=User, dispatch_uid='blog_feed_invalidate_user')
+def invalidate_user_feeds(sender, instance: User, raw: bool = False, update_fields=None, **kwargs) -> None:
+    """Имя автора выводится в ленте, поэтому её нужно собрать заново."""
+    if raw or _only_last_login(update_fields):
+        return
+    feeds.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User, dispatch_uid='blog_autocomplete_update_user')
+def update_autocomplete(sender, instance: User, raw: bool = False, update_fields=None, **kwargs) -> None:
+    """Обновляет пользователя в индексе автодополнения этого процесса."""
+    if raw or _only_last_login(update_fields):
+        return
+    autocomplete.index.update(instance)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='blog_autocomplete_remove_user')
+def remove_autocomplete(sender, instance: User, **kwargs) -> None:
+    """Удаляет пользователя из индекса автодополнения этого процесса."""
+    autocomplete.index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Post, dispatch_uid='blog_author_stats_saved')
+def update_stats_saved(sender, instance: Post, created: bool, raw: bool = False, **kwargs) -> None:
+    """Учитывает новый пост или перенос поста к другому автору."""
+    if raw:
+        return
+    if created:
+        stats.post_added(instance)
+    else:
+        previous_user_id = getattr(instance, '_loaded_user_id', instance.user_id)
+        if previous_user_id != instance.user_id:
+            stats.refresh([previous_user_id, instance.user_id])
+
+
+@receiver(post_delete, sender=Post, dispatch_uid='blog_author_stats_deleted')
+def update_stats_deleted(sender, instance: Post, **kwargs) -> None:
+    """Учитывает удаление поста."""
+    stats.post_removed(instance)
+
+
+@receiver(posts_bulk_changed, sender=Post, dispatch_uid='blog_author_stats_bulk')
+def update_stats_bulk(sender, posts: list[Post], **kwargs) -> None:
+    """Пересчитывает статистику авторов массово изменённых постов."""
+    stats.refresh(post.user_id for post in posts)
+
+
+@receiver(post_save, sender=User, dispatch_uid='blog_page_cache_user_saved')
+@receiver(post_delete, sender=User, dispatch_uid='blog_page_cache_user_deleted')
+def purge_user_pages(sender, instance: User, raw: bool = False, update_fields=None, **kwargs) -> None:
+    """Страницы автора выводят его имя, поэтому сбрасываются при правке профиля."""
+    if raw or _only_last_login(update_fields):
+        return
+    page_cache.purge(author_page_group(None, instance.username))
+
+
+def _purge_author_pages(user_ids) -> None:
+    usernames = User.objects.filter(pk__in=[pk for pk in set(user_ids) if pk is not None]).values_list('username', flat=True)
+    for username in usernames:
+        page_cache.purge(author_page_group(None, username))
+
+
+def _author_changed(user_ids, cached_user: User | None = None) -> None:
+    """
+    Сбрасывает страницы и ленты авторов в этом же запросе (после фиксации),
+    а сборку лент заново ставит задачей. Сброс дешёвый и должен попасть в кэш
+    веб-воркеров, даже если кэш у каждого процесса свой.
+    """
+    user_ids = set(user_ids) - {None}
+    if cached_user is not None and user_ids == {cached_user.pk}:
+        page_cache.purge(author_page_group(None, cached_user.username))
+    else:
+        _purge_author_pages(user_ids)
+    for user_id in user_ids:
+        feeds.invalidate(user_id)
+    _enqueue_author_changed(user_ids)
+
+
+@receiver(post_save, sender=Post, dispatch_uid='blog_author_changed_saved')
+@receiver(post_delete, sender=Post, dispatch_uid='blog_author_changed_deleted')
+def author_post_changed(sender, instance: Post, raw: bool = False, **kwargs) -> None:
+    """Сбрасывает страницы и ленты автора (и прежнего автора) поста."""
+    if raw:
+        return
+    # Автор обычно уже загружен view; иначе — один запрос за username
+    _author_changed(
+        {instance.user_id, getattr(instance, '_loaded_user_id', instance.user_id)},
+        instance._state.fields_cache.get('user'),
+    )
+
+
+@receiver(posts_bulk_changed, sender=Post, dispatch_uid='blog_author_changed_bulk')
+def authors_bulk_changed(sender, posts: list[Post], **kwargs) -> None:
+    """Сбрасывает страницы и ленты авторов массово изменённых постов."""
+    _author_changed(post.user_id for post in posts)
+
+
+@receiver(post_save, sender=Post, dispatch_uid='blog_timeline_fan_out')
+def fan_out_post(sender, instance: Post, created: bool, raw: bool = False, **kwargs) -> None:
+    """Ставит задачу разложить новый пост по лентам подписчиков автора."""
+    if created and not raw:
+        enqueue('blog.fan_out_posts', {'post_ids': [instance.pk]}, key=f'blog.fan_out_post:{instance.pk}')
+
+
+@receiver(posts_bulk_changed, sender=Post, dispatch_uid='blog_timeline_fan_out_bulk')
+def fan_out_bulk_posts(sender, posts: list[Post], created: list[Post] | None = None, **kwargs) -> None:
+    """
+    Ставит одну задачу разложить новые массово сохранённые посты по лентам.
+    Правка, как и у одиночного поста, ленты не трогает.
+    """
+    new_posts = posts if created is None else created
+    if new_posts:
+        enqueue('blog.fan_out_posts', {'post_ids': [post.pk for post in new_posts]})
+
+
+@receiver(post_save, sender=Follow, dispatch_uid='blog_follow_created')
+def follow_created(sender, instance: Follow, created: bool, raw: bool = False, **kwargs) -> None:
+    """Учитывает подписчика и ставит задачу добавить посты автора в его ленту."""
+    if raw or not created:
+        return
+    stats.follower_added(instance.author_id)
+    enqueue(
+        'blog.timeline_backfill',
+        {'follower_id': instance.follower_id, 'author_id': instance.author_id},
+        key=f'blog.timeline_backfill:{instance.follower_id}:{instance.author_id}',
+    )
+    # Число подписчиков выводится на странице автора
+    _purge_author_pages([instance.author_id])
+
+
+@receiver(post_delete, sender=Follow, dispatch_uid='blog_follow_deleted')
+def follow_deleted(sender, instance: Follow, **kwargs) -> None:
+    """Учитывает отписку и убирает посты автора из ленты бывшего подписчика."""
+    stats.follower_removed(instance.author_id)
+    timeline.remove(instance.follower_id, instance.author_id)
+    _purge_author_pages([instance.author_id])
+
+
+@receiver(posts_bulk_changed, sender=Post, dispatch_uid='blog_post_card_evict_bulk')
+def evict_bulk_cards(sender, posts: list[Post], **kwargs) -> None:
+    """Удаляет из кэша карточки прежних версий массово изменённых постов."""
+    for post in posts:
+        fragments.evict(post.pk, getattr(post, '_card_updated_at', None))
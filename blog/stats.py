@@ -0,0 +1,156 @@
+"""
+Поддержка AuthorStats — счётчиков постов и подписчиков и даты последнего
+поста автора.
+
+Создание поста увеличивает счётчик одним UPDATE, удаление уменьшает и
+пересчитывает дату последнего поста только если удалён самый свежий.
+Перенос поста к другому автору и массовые изменения пересчитывают
+затронутых авторов агрегатом по индексу (user, -created_at).
+Подписка и отписка меняют счётчик подписчиков одним UPDATE.
+Все функции вызываются из сигналов внутри транзакции изменения поста
+или подписки, так что счётчики фиксируются и откатываются вместе с ним.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AuthorStats, Follow, Post
+
+
+def post_added(post: Post) -> None:
+    """Учитывает новый пост автора."""
+    if post.user_id is None:
+        return
+    # Без точки сохранения: вызывается внутри транзакции сохранения поста
+    with transaction.atomic(savepoint=False):
+        updated = AuthorStats.objects.filter(pk=post.user_id).update(
+            post_count=F('post_count') + 1,
+            # Greatest в SQLite возвращает NULL, если хотя бы один аргумент NULL
+            last_post_at=Greatest(Coalesce(F('last_post_at'), Value(post.created_at)), Value(post.created_at)),
+        )
+        if not updated:
+            refresh([post.user_id])
+
+
+def post_removed(post: Post) -> None:
+    """Учитывает удаление поста автора."""
+    if post.user_id is None:
+        return
+    with transaction.atomic(savepoint=False):
+        stats = AuthorStats.objects.select_for_update().filter(pk=post.user_id).first()
+        if stats is None:
+            # Строки нет (в том числе её уже удалил каскад вместе с автором)
+            return
+        if stats.post_count == 0:
+            refresh([post.user_id])
+            return
+        stats.post_count -= 1
+        if stats.post_count == 0:
+            stats.last_post_at = None
+        elif stats.last_post_at is None or post.created_at >= stats.last_post_at:
+            # Удалён последний пост: берём следующий по индексу (user, -created_at)
+            stats.last_post_at = (
+                Post.objects.filter(user_id=post.user_id)
+                .order_by('-created_at')
+                .values_list('created_at', flat=True)
+                .first()
+            )
+        stats.save(update_fields=['post_count', 'last_post_at'])
+
+
+def follower_added(author_id: int) -> None:
+    """Учитывает нового подписчика автора."""
+    with transaction.atomic(savepoint=False):
+        updated = AuthorStats.objects.filter(pk=author_id).update(follower_count=F('follower_count') + 1)
+        if not updated:
+            refresh([author_id])
+
+
+def follower_removed(author_id: int) -> None:
+    """Учитывает отписку от автора."""
+    # Строки может уже не быть, если автора удаляют вместе с подписками
+    AuthorStats.objects.filter(pk=author_id, follower_count__gt=0).update(follower_count=F('follower_count') - 1)
+
+
+def refresh(user_ids) -> None:
+    """Пересчитывает статистику указанных авторов по их постам."""
+    user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+    if not user_ids:
+        return
+    actual = _aggregate(Post.objects.filter(user_id__in=user_ids))
+    followers = _follower_counts(Follow.objects.filter(author_id__in=user_ids))
+    rows = []
+    for user_id in user_ids:
+        count, last_post_at = actual.get(user_id, (0, None))
+        rows.append(AuthorStats(
+            user_id=user_id, post_count=count, last_post_at=last_post_at,
+            follower_count=followers.get(user_id, 0),
+        ))
+    with transaction.atomic():
+        AuthorStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['post_count', 'last_post_at', 'follower_count'],
+        )
+
+
+def reconcile(user_ids=None, batch_size: int = 1000) -> int:
+    """
+    Сверяет AuthorStats с постами и исправляет расхождения.
+
+    Без user_ids проверяются все авторы. Возвращает число исправленных строк.
+    """
+    posts = Post.objects.filter(user__isnull=False)
+    follows = Follow.objects.all()
+    stats = AuthorStats.objects.all()
+    if user_ids is not None:
+        posts = posts.filter(user_id__in=user_ids)
+        follows = follows.filter(author_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+    posted = _aggregate(posts)
+    followers = _follower_counts(follows)
+    actual = {
+        user_id: (*posted.get(user_id, (0, None)), followers.get(user_id, 0))
+        for user_id in posted.keys() | followers.keys()
+    }
+    stored = {
+        user_id: (count, last_post_at, follower_count)
+        for user_id, count, last_post_at, follower_count
+        in stats.values_list('user_id', 'post_count', 'last_post_at', 'follower_count')
+    }
+
+    drifted = [
+        AuthorStats(user_id=user_id, post_count=count, last_post_at=last_post_at, follower_count=follower_count)
+        for user_id, (count, last_post_at, follower_count) in actual.items()
+        if stored.get(user_id) != (count, last_post_at, follower_count)
+    ]
+    emptied = [
+        user_id for user_id, values in stored.items()
+        if user_id not in actual and values != (0, None, 0)
+    ]
+    with transaction.atomic():
+        AuthorStats.objects.bulk_create(
+            drifted,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['post_count', 'last_post_at', 'follower_count'],
+        )
+        AuthorStats.objects.filter(user_id__in=emptied).update(post_count=0, last_post_at=None, follower_count=0)
+    return len(drifted) + len(emptied)
+
+
+def _aggregate(posts) -> dict[int, tuple[int, object]]:
+    rows = (
+        posts.order_by()
+        .values('user_id')
+        .annotate(count=Count('id'), last_post_at=Max('created_at'))
+        .values_list('user_id', 'count', 'last_post_at')
+    )
+    return {user_id: (count, last_post_at) for user_id, count, last_post_at in rows}
+
+
+def _follower_counts(follows) -> dict[int, int]:
+    rows = follows.order_by().values('author_id').annotate(count=Count('id')).values_list('author_id', 'count')
+    return dict(rows)
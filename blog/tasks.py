@@ -0,0 +1,56 @@
+"""
+Фоновые задачи блога (выполняет воркер очереди, см. jobs/queue.py).
+
+Задачи ставятся сигналами (blog/signals.py) в транзакции изменения поста
+и приводят производные данные к состоянию в базе, поэтому их можно
+безопасно повторять и объединять.
+"""
+from django.contrib.auth.models import User
+
+from jobs.queue import job
+from . import feeds, search, timeline
+from .models import Post
+
+
+@job('blog.sync_post')
+def sync_post(post_id: int) -> None:
+    """Обновляет пост в поисковом индексе или удаляет, если поста уже нет."""
+    post = Post.objects.only('user_id', 'title', 'content').filter(pk=post_id).first()
+    if post is None:
+        search.remove_post(post_id)
+    else:
+        search.index_post(post)
+
+
+@job('blog.sync_posts')
+def sync_posts(post_ids: list[int]) -> None:
+    """Массовый вариант sync_post для bulk-операций."""
+    posts = Post.objects.only('user_id', 'title', 'content').in_bulk(post_ids)
+    search.index_posts(list(posts.values()))
+    for post_id in set(post_ids) - posts.keys():
+        search.remove_post(post_id)
+
+
+@job('blog.author_changed')
+def author_changed(user_id: int) -> None:
+    """
+    Заново собирает ленты автора (только с общим кэшем, см.
+    feeds.regenerate). Страницы и ленты сбрасывает сам запрос
+    на запись (blog/signals.py): при кэше в памяти процесса сброс из
+    воркера не дошёл бы до сайта.
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        feeds.regenerate(user)
+
+
+@job('blog.fan_out_posts')
+def fan_out_posts(post_ids: list[int]) -> None:
+    """Раскладывает посты по домашним лентам подписчиков авторов."""
+    timeline.fan_out(post_ids)
+
+
+@job('blog.timeline_backfill')
+def timeline_backfill(follower_id: int, author_id: int) -> None:
+    """Добавляет последние посты автора в ленту нового подписчика."""
+    timeline.backfill(follower_id, author_id)
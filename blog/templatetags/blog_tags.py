@@ -0,0 +1,13 @@
+"""Шаблонные теги приложения blog."""
+from django import template
+from django.utils.safestring import SafeString, mark_safe
+
+from blog import fragments
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post, show_actions=False) -> SafeString:
+    """Карточка поста из кэша фрагментов (см. blog/fragments.py)."""
+    return mark_safe(fragments.render_card(post, bool(show_actions)))
@@ -0,0 +1,135 @@
+"""
+Домашняя лента: посты авторов, на которых подписан пользователь.
+
+Лента собирается из двух источников:
+
+* fan-out on write — новый пост обычного автора фоновая задача
+  (blog/tasks.py) раскладывает по TimelineEntry всех его подписчиков,
+  и страница ленты читается одним запросом по индексу
+  (owner, -created_at, post), сколько бы авторов ни было в подписках;
+* merge on read — посты авторов, которых раскладывать дорого (много
+  подписчиков или очень много постов, см. merged_authors_condition),
+  не материализуются: для каждого такого автора из подписок и для
+  собственных постов читателя берётся по странице по индексу
+  (user, -created_at), и всё сливается с материализованной частью.
+
+Порядок и курсор — те же, что у остальных лент (blog/pagination.py).
+При подписке последние посты автора добавляются в ленту фоновой
+задачей, при отписке — удаляются сразу. Если автор перестал считаться
+«тяжёлым», его посты за это время в ленты не попали; их восстанавливает
+``manage.py rebuild_timelines``.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .pagination import after_cursor, encode_cursor, get_page_size
+
+# Сколько записей ленты добавлять одним INSERT при раскладке
+_BATCH_SIZE = 1000
+
+
+def get_fanout_max_followers() -> int:
+    """С какого числа подписчиков посты автора не раскладываются по лентам."""
+    return getattr(settings, 'BLOG_TIMELINE_FANOUT_MAX_FOLLOWERS', 2000)
+
+
+def get_prolific_posts() -> int:
+    """С какого числа постов автор считается слишком плодовитым для раскладки."""
+    return getattr(settings, 'BLOG_TIMELINE_PROLIFIC_POSTS', 5000)
+
+
+def get_backfill_size() -> int:
+    """Сколько последних постов автора добавлять в ленту при подписке."""
+    return getattr(settings, 'BLOG_TIMELINE_BACKFILL', 200)
+
+
+def merged_authors_condition() -> Q:
+    """Условие на AuthorStats: посты автора подмешиваются при чтении."""
+    return Q(follower_count__gte=get_fanout_max_followers()) | Q(post_count__gte=get_prolific_posts())
+
+
+def is_merged_on_read(author_id: int) -> bool:
+    """Подмешиваются ли посты автора при чтении вместо раскладки."""
+    return AuthorStats.objects.filter(merged_authors_condition(), pk=author_id).exists()
+
+
+def fan_out(post_ids: list[int]) -> int:
+    """Раскладывает посты по лентам подписчиков. Возвращает число записей."""
+    posts = Post.objects.filter(pk__in=post_ids, user__isnull=False).only('user_id', 'created_at')
+    merged = set(
+        AuthorStats.objects.filter(merged_authors_condition(), pk__in=posts.values('user_id'))
+        .values_list('pk', flat=True)
+    )
+    created = 0
+    for post in posts:
+        if post.user_id in merged:
+            continue
+        followers = Follow.objects.filter(author_id=post.user_id).values_list('follower_id', flat=True)
+        entries = [
+            TimelineEntry(owner_id=follower_id, post_id=post.pk, created_at=post.created_at)
+            for follower_id in followers.iterator(chunk_size=_BATCH_SIZE)
+        ]
+        # Повторная раскладка (доставка задачи не единожды) ничего не дублирует
+        TimelineEntry.objects.bulk_create(entries, batch_size=_BATCH_SIZE, ignore_conflicts=True)
+        created += len(entries)
+    return created
+
+
+def backfill(follower_id: int, author_id: int) -> int:
+    """Добавляет в ленту подписчика последние посты автора."""
+    if is_merged_on_read(author_id) or not Follow.objects.filter(follower_id=follower_id, author_id=author_id).exists():
+        return 0
+    posts = after_cursor(Post.objects.filter(user_id=author_id), None).values_list('pk', 'created_at')
+    entries = [
+        TimelineEntry(owner_id=follower_id, post_id=post_id, created_at=created_at)
+        for post_id, created_at in posts[:get_backfill_size()]
+    ]
+    TimelineEntry.objects.bulk_create(entries, batch_size=_BATCH_SIZE, ignore_conflicts=True)
+    return len(entries)
+
+
+def remove(follower_id: int, author_id: int) -> None:
+    """Убирает посты автора из ленты бывшего подписчика."""
+    TimelineEntry.objects.filter(owner_id=follower_id, post__user_id=author_id).delete()
+
+
+def rebuild(user: User) -> int:
+    """Собирает материализованную ленту пользователя заново."""
+    TimelineEntry.objects.filter(owner=user).delete()
+    return sum(
+        backfill(user.pk, author_id)
+        for author_id in Follow.objects.filter(follower=user).values_list('author_id', flat=True)
+    )
+
+
+def page(user: User, cursor: str | None, page_size: int | None = None) -> tuple[list[Post], str | None]:
+    """
+    Страница домашней ленты после курсора и курсор следующей страницы.
+    При некорректном курсоре бросает ValueError.
+    """
+    page_size = page_size or get_page_size()
+    candidates = list(
+        after_cursor(TimelineEntry.objects.filter(owner=user), cursor, id_field='post_id')
+        .values_list('created_at', 'post_id')[:page_size + 1]
+    )
+    # Собственные посты и посты «тяжёлых» авторов — по странице с каждого
+    merged = [user.pk, *(
+        AuthorStats.objects.filter(merged_authors_condition(), user__followers__follower=user)
+        .values_list('pk', flat=True)
+    )]
+    for author_id in merged:
+        candidates += after_cursor(Post.objects.filter(user_id=author_id), cursor).values_list('created_at', 'pk')[:page_size + 1]
+
+    # Порядок лент: created_at по убыванию, при равенстве id по возрастанию
+    candidates.sort(key=lambda item: item[1])
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    post_ids = list(dict.fromkeys(post_id for _, post_id in candidates))[:page_size + 1]
+
+    has_next = len(post_ids) > page_size
+    post_ids = post_ids[:page_size]
+    posts = Post.objects.defer('content').select_related('user').in_bulk(post_ids)
+    items = [posts[post_id] for post_id in post_ids if post_id in posts]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].pk) if has_next and items else None
+    return items, next_cursor
@@ -1,11 +1,25 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
-from django.db.models import Q
+from django.http import (
+    HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_POST
 from django import forms
-from .models import Post
+from django.db import transaction
+from core.page_cache import anonymous_page_cache
+from core.ratelimit import ratelimit
+from core.routers import read_only_view
+from .models import Follow, Post
+from .conditional import author_page_group, author_validators, follower_count, not_modified, set_validators
+from .pagination import page_context, paginate
+from . import autocomplete, feeds, fragments, search, timeline
 
 
 class PostForm(forms.ModelForm):
@@ -19,11 +33,108 @@ class PostForm(forms.ModelForm):
         }
 
 
+def _posts_page_context(request: HttpRequest, queryset, page_url: str, fragment_url: str) -> dict:
+    """Контекст страницы ленты с постами после курсора из ?cursor=."""
+    posts, next_cursor = paginate(queryset, request.GET.get('cursor'))
+    return page_context(posts, next_cursor, page_url, fragment_url)
+
+
 @login_required
+@read_only_view
 def post_list(request: HttpRequest) -> HttpResponse:
     """Список постов текущего пользователя."""
-    posts = Post.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, "blog_list.html", {"posts": posts})
+    validators = author_validators(request, request.user.pk)
+    response = not_modified(request, validators)
+    if response is not None:
+        return response
+
+    try:
+        context = _posts_page_context(
+            request,
+            Post.objects.filter(user=request.user).defer('content'),
+            reverse('blog'),
+            reverse('post_list_page'),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+    return set_validators(request, render(request, "blog_list.html", context), validators)
+
+
+@login_required
+@read_only_view
+def post_list_page(request: HttpRequest) -> HttpResponse:
+    """Следующая страница списка постов текущего пользователя (HTML-фрагмент)."""
+    validators = author_validators(request, request.user.pk)
+    response = not_modified(request, validators)
+    if response is not None:
+        return response
+
+    try:
+        context = _posts_page_context(
+            request,
+            Post.objects.filter(user=request.user).defer('content'),
+            reverse('blog'),
+            reverse('post_list_page'),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+    context["show_actions"] = True
+    return set_validators(request, render(request, "partials/post_page.html", context), validators)
+
+
+def _timeline_context(request: HttpRequest) -> dict:
+    """Контекст страницы домашней ленты после курсора из ?cursor=."""
+    posts, next_cursor = timeline.page(request.user, request.GET.get('cursor'))
+    return page_context(posts, next_cursor, reverse('timeline'), reverse('timeline_page'))
+
+
+@login_required
+@read_only_view
+def home_timeline(request: HttpRequest) -> HttpResponse:
+    """Лента постов авторов, на которых подписан пользователь, и его собственных."""
+    try:
+        context = _timeline_context(request)
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+    return render(request, "timeline.html", context)
+
+
+@login_required
+@read_only_view
+def timeline_page(request: HttpRequest) -> HttpResponse:
+    """Следующая страница домашней ленты (HTML-фрагмент)."""
+    try:
+        context = _timeline_context(request)
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+    return render(request, "partials/timeline_page.html", context)
+
+
+@login_required
+@require_POST
+def follow_user(request: HttpRequest, username: str) -> HttpResponse:
+    """Подписка на автора."""
+    author = get_object_or_404(User, username=username)
+    if author == request.user:
+        return HttpResponseBadRequest("Нельзя подписаться на самого себя")
+    # Подписка и счётчик подписчиков (blog/stats.py) фиксируются вместе
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(follower=request.user, author=author)
+    if created:
+        messages.success(request, f'Вы подписались на {author.username}')
+    return redirect('user_posts', username=author.username)
+
+
+@login_required
+@require_POST
+def unfollow_user(request: HttpRequest, username: str) -> HttpResponse:
+    """Отписка от автора."""
+    author = get_object_or_404(User, username=username)
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(follower=request.user, author=author).delete()
+    if deleted:
+        messages.success(request, f'Вы отписались от {author.username}')
+    return redirect('user_posts', username=author.username)
 
 
 @login_required
@@ -34,7 +145,9 @@ def post_create(request: HttpRequest) -> HttpResponse:
         if form.is_valid():
             post = form.save(commit=False)
             post.user = request.user
-            post.save()
+            # Пост и статистика автора (blog/stats.py) фиксируются вместе
+            with transaction.atomic():
+                post.save()
             messages.success(request, 'Пост успешно создан!')
             return redirect('blog')
     else:
@@ -59,7 +172,9 @@ def post_edit(request: HttpRequest, post_id: int) -> HttpResponse:
     if request.method == 'POST':
         form = PostForm(request.POST, instance=post)
         if form.is_valid():
-            form.save()
+            # Пост и задачи (blog/tasks.py) фиксируются вместе
+            with transaction.atomic():
+                form.save()
             messages.success(request, 'Пост успешно обновлен!')
             return redirect('blog')
     else:
@@ -90,33 +205,124 @@ def post_delete(request: HttpRequest, post_id: int) -> HttpResponse:
     return render(request, "post_delete.html", {"post": post})
 
 
+@ratelimit('user_search')
+@read_only_view
 def user_search(request: HttpRequest) -> HttpResponse:
-    """Поиск пользователей."""
+    """Поиск пользователей по имени, email и текстам их постов."""
     query = request.GET.get('q', '').strip()
-    users = User.objects.none()
-    
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    results, has_next = [], False
     if query:
-        # Ищем пользователей по username, first_name, last_name, email
-        users = User.objects.filter(
-            Q(username__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query)
-        ).distinct().order_by('username')
-    
+        results, has_next = search.search_users(query, page)
+
     return render(request, "user_search.html", {
-        "users": users,
-        "query": query
+        "results": results,
+        "query": query,
+        "page": page,
+        "previous_page": page - 1 if page > 1 else None,
+        "next_page": page + 1 if has_next else None,
+    })
+
+
+@ratelimit('user_autocomplete')
+@read_only_view
+def user_autocomplete(request: HttpRequest) -> JsonResponse:
+    """Подсказки для строки поиска пользователей (JSON)."""
+    suggestions = autocomplete.suggest(request.GET.get('q', '')[:100])
+    response = JsonResponse({
+        "results": [
+            {
+                "username": suggestion.username,
+                "name": suggestion.full_name,
+                "url": reverse('user_posts', args=[suggestion.username]),
+            }
+            for suggestion in suggestions
+        ],
     })
+    patch_cache_control(response, max_age=settings.AUTOCOMPLETE_MAX_AGE)
+    return response
 
 
+@anonymous_page_cache(author_page_group)
+@read_only_view
 def user_posts(request: HttpRequest, username: str) -> HttpResponse:
     """Просмотр постов конкретного пользователя."""
-    user = get_object_or_404(User, username=username)
-    posts = Post.objects.filter(user=user).order_by('-created_at')
-    
-    return render(request, "user_posts.html", {
+    user = get_object_or_404(User.objects.select_related('post_stats'), username=username)
+    is_following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(follower=request.user, author=user).exists()
+    )
+    # Имя автора, число подписчиков и подписка зрителя тоже выводятся
+    # на странице, поэтому входят в валидатор
+    validators = author_validators(
+        request, user.pk, user.get_full_name(), follower_count(user), is_following,
+    )
+    response = not_modified(request, validators)
+    if response is not None:
+        return response
+
+    try:
+        context = _posts_page_context(
+            request,
+            Post.objects.filter(user=user).defer('content'),
+            reverse('user_posts', args=[user.username]),
+            reverse('user_posts_page', args=[user.username]),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+
+    context.update({
         "profile_user": user,
-        "posts": posts,
-        "is_own_profile": request.user.is_authenticated and request.user == user
+        "is_own_profile": request.user.is_authenticated and request.user == user,
+        "is_following": is_following,
     })
+    return set_validators(request, render(request, "user_posts.html", context), validators)
+
+
+@anonymous_page_cache(author_page_group)
+@read_only_view
+def user_posts_page(request: HttpRequest, username: str) -> HttpResponse:
+    """Следующая страница постов пользователя (HTML-фрагмент)."""
+    user = get_object_or_404(User, username=username)
+    # Имя автора тоже выводится на странице, поэтому входит в валидатор
+    validators = author_validators(request, user.pk, user.get_full_name())
+    response = not_modified(request, validators)
+    if response is not None:
+        return response
+
+    try:
+        context = _posts_page_context(
+            request,
+            Post.objects.filter(user=user).defer('content'),
+            reverse('user_posts', args=[user.username]),
+            reverse('user_posts_page', args=[user.username]),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Некорректный курсор")
+    return set_validators(request, render(request, "partials/post_page.html", context), validators)
+
+
+@read_only_view
+def user_feed(request: HttpRequest, username: str, kind: str) -> HttpResponse:
+    """Atom- или RSS-лента последних постов пользователя."""
+    user = get_object_or_404(User, username=username)
+    feed = feeds.get_feed(request, user, kind)
+    response = get_conditional_response(request, etag=feed.etag, last_modified=feed.last_modified)
+    if response is None:
+        response = StreamingHttpResponse(feeds.iter_chunks(feed.body), content_type=feed.content_type)
+        response.headers['Content-Length'] = len(feed.body)
+    response.headers['ETag'] = feed.etag
+    if feed.last_modified is not None:
+        response.headers['Last-Modified'] = http_date(feed.last_modified)
+    patch_cache_control(response, public=True, max_age=settings.BLOG_FEED_MAX_AGE)
+    return response
+
+
+@staff_member_required
+def post_card_cache_stats(request: HttpRequest) -> JsonResponse:
+    """Счётчики кэша карточек постов (для кэша в памяти — только этого воркера)."""
+    return JsonResponse(fragments.stats())
@@ -3,6 +3,21 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Под ASGI включаются асинхронные версии читающих view (DJANGO_ASYNC_VIEWS=1):
+index, user_search и user_posts обслуживают медленных клиентов, не занимая
+по воркеру на соединение. Запуск:
+
+    # один процесс uvicorn (разработка)
+    uvicorn core.asgi:application --host 127.0.0.1 --port 8000
+
+    # продакшен: gunicorn управляет процессами, внутри каждого — цикл событий uvicorn
+    gunicorn core.asgi:application -k uvicorn_worker.UvicornWorker \
+        --workers 3 --bind unix:/run/makrei_online.sock
+
+Все middleware из settings.MIDDLEWARE должны поддерживать async, иначе
+Django будет переключаться в поток на каждом из них; это проверяется
+системной проверкой main.W001.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +27,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,153 @@
+"""
+Кэш целых страниц для анонимных посетителей.
+
+Декоратор anonymous_page_cache отдаёт сохранённый HTML запросам без
+cookie сессии и flash-сообщений — до входа в view, без обращения к
+сессии, пользователю и базе. Ответ попадает в кэш, только если он
+одинаков для всех анонимных посетителей: код 200, без Set-Cookie, без
+использования CSRF-токена (страница с формой содержит токен конкретного
+посетителя) и без Cache-Control private/no-store.
+
+Страницы объединяются в группы (например, все страницы одного автора).
+В ключе есть версия группы, и purge(group) после фиксации транзакции
+меняет версию, так что все страницы группы перестают находиться разом.
+Ко всем ответам добавляется Vary: Cookie, чтобы промежуточные кэши не
+отдали анонимную страницу вошедшему пользователю.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import parse_http_date_safe
+
+_VERSION_KEY = 'page:version:{}'
+
+# Заголовки, которые сохраняются вместе с телом страницы
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Content-Language')
+
+# Cookie, при наличии которых страница может отличаться от анонимной
+_MESSAGES_COOKIE = 'messages'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE', 'default')]
+
+
+def get_timeout() -> int:
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 5 * 60)
+
+
+def purge(group: str) -> None:
+    """Сбрасывает все страницы группы после фиксации текущей транзакции."""
+    transaction.on_commit(
+        lambda: get_cache().set(_VERSION_KEY.format(group), time.time_ns(), None),
+        robust=True,
+    )
+
+
+def anonymous_page_cache(group):
+    """
+    Кэширует страницу для анонимных посетителей.
+
+    group — строка или функция (request, *args, **kwargs) -> str,
+    определяющая группу страниц для purge().
+    """
+    def group_for(request, args, kwargs) -> str:
+        return group(request, *args, **kwargs) if callable(group) else group
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request: HttpRequest, *args, **kwargs):
+                if not _is_anonymous(request):
+                    return _vary(await view(request, *args, **kwargs))
+                cache = get_cache()
+                page_group = group_for(request, args, kwargs)
+                version = await cache.aget(_VERSION_KEY.format(page_group), 0)
+                key = _page_key(request, page_group, version)
+                stored = await cache.aget(key)
+                if stored is not None:
+                    return _from_cache(request, stored)
+                response = await view(request, *args, **kwargs)
+                if _is_cacheable(request, response):
+                    await cache.aset(key, _to_cache(response), get_timeout())
+                return _vary(response)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs):
+            if not _is_anonymous(request):
+                return _vary(view(request, *args, **kwargs))
+            cache = get_cache()
+            page_group = group_for(request, args, kwargs)
+            version = cache.get(_VERSION_KEY.format(page_group), 0)
+            key = _page_key(request, page_group, version)
+            stored = cache.get(key)
+            if stored is not None:
+                return _from_cache(request, stored)
+            response = view(request, *args, **kwargs)
+            if _is_cacheable(request, response):
+                cache.set(key, _to_cache(response), get_timeout())
+            return _vary(response)
+        return wrapper
+    return decorator
+
+
+def _is_anonymous(request: HttpRequest) -> bool:
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    cookies = request.COOKIES
+    return settings.SESSION_COOKIE_NAME not in cookies and _MESSAGES_COOKIE not in cookies
+
+
+def _page_key(request: HttpRequest, group: str, version) -> str:
+    url = f"{request.scheme}://{request.get_host()}{request.get_full_path()}"
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f"page:{group}:{version}:{digest}"
+
+
+def _is_cacheable(request: HttpRequest, response: HttpResponse) -> bool:
+    if request.method != 'GET' or response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return False
+    cache_control = response.headers.get('Cache-Control', '')
+    return 'private' not in cache_control and 'no-store' not in cache_control
+
+
+def _to_cache(response: HttpResponse) -> dict:
+    return {
+        'content': response.content,
+        'headers': {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+    }
+
+
+def _from_cache(request: HttpRequest, stored: dict) -> HttpResponse:
+    headers = stored['headers']
+    # Страница с ETag перепроверяется только по нему: Last-Modified
+    # может не отражать всего, от чего она зависит
+    last_modified = None
+    if 'ETag' not in headers and 'Last-Modified' in headers:
+        last_modified = parse_http_date_safe(headers['Last-Modified'])
+    response = get_conditional_response(request, etag=headers.get('ETag'), last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(stored['content'])
+        for name, value in headers.items():
+            response.headers[name] = value
+    else:
+        for name in ('ETag', 'Last-Modified', 'Cache-Control'):
+            if name in headers:
+                response.headers[name] = headers[name]
+    response.headers['X-Page-Cache'] = 'hit'
+    return _vary(response)
+
+
+def _vary(response: HttpResponse) -> HttpResponse:
+    patch_vary_headers(response, ['Cookie'])
+    return response
@@ -0,0 +1,229 @@
+"""
+Профилирование запросов: SQL, шаблоны, view и общее время.
+
+ProfilingMiddleware включается настройкой PROFILING['ENABLED']. Для
+выбранных сэмплированием запросов (PROFILING['SAMPLE_RATE']) она
+перехватывает все SQL-запросы и время отрисовки шаблонов, отдаёт итоги
+в заголовке Server-Timing и пишет запросы медленнее
+PROFILING['SLOW_REQUEST_MS'] в журнал медленных запросов (JSON Lines)
+вместе с текстом SQL и найденными повторами. Для остальных запросов
+меряется только общее время, так что middleware можно держать
+включённой в продакшене с небольшой долей сэмплирования.
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+from django.template.backends.django import Template as DjangoTemplate
+
+logger = logging.getLogger('core.profiling')
+
+DEFAULTS = {
+    'ENABLED': False,
+    # Доля запросов, для которых собираются SQL и время шаблонов
+    'SAMPLE_RATE': 0.05,
+    # Запросы медленнее порога попадают в журнал медленных запросов
+    'SLOW_REQUEST_MS': 500,
+    # Файл журнала; None — только логгер core.profiling
+    'SLOW_LOG': None,
+    # Сколько SQL-запросов сохранять в записи журнала
+    'MAX_LOGGED_QUERIES': 100,
+    # С какого числа одинаковых по тексту запросов считать их подозрением на N+1
+    'SIMILAR_QUERIES_THRESHOLD': 5,
+    'SERVER_TIMING': True,
+}
+
+_current: ContextVar['RequestProfile | None'] = ContextVar('request_profile', default=None)
+
+
+def get_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, 'PROFILING', {})}
+
+
+@dataclass
+class RequestProfile:
+    """Данные профилирования одного запроса."""
+    started: float = field(default_factory=time.perf_counter)
+    sql_time: float = 0.0
+    queries: list[tuple[str, str, object, float]] = field(default_factory=list)
+    template_time: float = 0.0
+    template_depth: int = 0
+    view_started: float | None = None
+
+    def add_query(self, alias: str, sql: str, params, duration: float) -> None:
+        self.sql_time += duration
+        self.queries.append((alias, sql, params, duration))
+
+    def duplicates(self, similar_threshold: int) -> dict:
+        """Повторы: одинаковые запросы с одинаковыми параметрами и похожие (N+1)."""
+        exact = Counter((sql, repr(params)) for _, sql, params, _ in self.queries)
+        similar = Counter(sql for _, sql, _, _ in self.queries)
+        return {
+            'exact': [
+                {'sql': sql, 'params': params, 'count': count}
+                for (sql, params), count in exact.most_common() if count > 1
+            ],
+            'similar': [
+                {'sql': sql, 'count': count}
+                for sql, count in similar.most_common() if count >= similar_threshold
+            ],
+        }
+
+
+def _record_sql(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(context['connection'].alias, sql, params, time.perf_counter() - started)
+
+
+def _install_sql_wrapper(connection, **kwargs) -> None:
+    if _record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_sql)
+
+
+def _install_template_timer() -> None:
+    """Оборачивает отрисовку шаблонов Django, учитывая только внешний вызов."""
+    if getattr(DjangoTemplate.render, '_profiled', False):
+        return
+    original_render = DjangoTemplate.render
+
+    def render(self, context=None, request=None):
+        profile = _current.get()
+        if profile is None:
+            return original_render(self, context, request)
+        profile.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            profile.template_depth -= 1
+            if profile.template_depth == 0:
+                profile.template_time += time.perf_counter() - started
+
+    render._profiled = True
+    DjangoTemplate.render = render
+
+
+class ProfilingMiddleware:
+    """Server-Timing и журнал медленных запросов (см. PROFILING в settings)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.config = get_config()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+        connection_created.connect(_install_sql_wrapper, dispatch_uid='core_profiling_sql')
+        for connection in connections.all(initialized_only=True):
+            _install_sql_wrapper(connection)
+        _install_template_timer()
+        self._configure_slow_log()
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile, token = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, profile, sampled=token is not None)
+
+    async def __acall__(self, request: HttpRequest):
+        profile, token = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, profile, sampled=token is not None)
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        profile = _current.get()
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+        return None
+
+    def _start(self) -> tuple[RequestProfile, object | None]:
+        profile = RequestProfile()
+        if random.random() >= self.config['SAMPLE_RATE']:
+            # Не попавший в выборку запрос: только общее время, без перехвата SQL
+            return profile, None
+        return profile, _current.set(profile)
+
+    def _finish(self, request: HttpRequest, response: HttpResponse, profile: RequestProfile, sampled: bool) -> HttpResponse:
+        finished = time.perf_counter()
+        total_ms = (finished - profile.started) * 1000
+        view_ms = (finished - profile.view_started) * 1000 if profile.view_started else None
+
+        if self.config['SERVER_TIMING']:
+            metrics = []
+            if sampled:
+                metrics.append(f'sql;dur={profile.sql_time * 1000:.2f};desc="{len(profile.queries)} queries"')
+                metrics.append(f'tpl;dur={profile.template_time * 1000:.2f}')
+                if view_ms is not None:
+                    metrics.append(f'view;dur={view_ms:.2f}')
+            metrics.append(f'total;dur={total_ms:.2f}')
+            response.headers['Server-Timing'] = ', '.join(metrics)
+
+        if total_ms >= self.config['SLOW_REQUEST_MS']:
+            self._log_slow(request, response, profile, total_ms, view_ms, sampled)
+        return response
+
+    def _log_slow(self, request, response, profile, total_ms, view_ms, sampled) -> None:
+        record = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'sampled': sampled,
+        }
+        if sampled:
+            limit = self.config['MAX_LOGGED_QUERIES']
+            record.update({
+                'view_ms': round(view_ms, 2) if view_ms is not None else None,
+                'template_ms': round(profile.template_time * 1000, 2),
+                'sql_ms': round(profile.sql_time * 1000, 2),
+                'sql_count': len(profile.queries),
+                'queries': [
+                    {'alias': alias, 'sql': sql, 'params': repr(params), 'ms': round(duration * 1000, 3)}
+                    for alias, sql, params, duration in profile.queries[:limit]
+                ],
+                'duplicates': profile.duplicates(self.config['SIMILAR_QUERIES_THRESHOLD']),
+            })
+        logger.warning(json.dumps(record, ensure_ascii=False, default=str))
+
+    def _configure_slow_log(self) -> None:
+        path = self.config['SLOW_LOG']
+        if not path:
+            return
+        path = Path(path)
+        if any(getattr(handler, 'baseFilename', None) == str(path.resolve()) for handler in logger.handlers):
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
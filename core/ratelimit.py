@@ -0,0 +1,284 @@
+"""
+Ограничение частоты запросов (token bucket), общее для всех воркеров.
+
+Состояние корзин хранится в отдельном файле SQLite (RATELIMIT['DATABASE'],
+по умолчанию в /dev/shm, то есть в памяти), поэтому лимит один на все
+процессы gunicorn и не требует внешнего сервиса. Каждая корзина вмещает
+N токенов и пополняется со скоростью N за период; запрос забирает один
+токен, а при пустой корзине получает 429 с Retry-After.
+
+Политики описываются в RATELIMIT['POLICIES'] и подключаются к view
+декоратором ratelimit('имя'). У политики может быть несколько областей:
+
+* ip — адрес клиента (для IPv6 — сеть /64);
+* user — вошедший пользователь, анонимные запросы не учитываются;
+* username — имя из POST-формы, защищает учётную запись от перебора
+  пароля с разных адресов.
+
+Отказы считаются по каждой политике и области в том же файле, их
+показывает команда ``manage.py ratelimit_stats``. При ошибке хранилища
+запрос пропускается: ограничитель не должен ронять сайт.
+"""
+import ipaddress
+import logging
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger('core.ratelimit')
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Файл SQLite с корзинами и счётчиками отказов
+    'DATABASE': Path(tempfile.gettempdir()) / 'ratelimit.sqlite3',
+    # Ключ request.META с адресом клиента (за nginx — HTTP_X_REAL_IP)
+    'IP_META_KEY': 'REMOTE_ADDR',
+    'POLICIES': {},
+}
+
+SCOPES = ('ip', 'user', 'username')
+
+# Ключ request.META, которым внутренние запросы (прогрев воркера, см.
+# main/warmup.py) освобождаются от ограничений. Из HTTP его не передать:
+# заголовки попадают в META только с префиксом HTTP_
+EXEMPT_META_KEY = 'ratelimit.exempt'
+
+_RATE_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\s*$')
+_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+# Как часто (в секундах) каждый процесс удаляет полные корзины
+_PURGE_INTERVAL = 60
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS buckets (
+        key TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated REAL NOT NULL,
+        full_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at);
+    CREATE TABLE IF NOT EXISTS rejects (
+        counter TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        last_at REAL NOT NULL
+    ) WITHOUT ROWID;
+"""
+
+
+def get_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, 'RATELIMIT', {})}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Ёмкость корзины и скорость пополнения (токенов в секунду)."""
+    capacity: int
+    per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> 'Rate':
+        """Разбирает строку вида '10/m', '100/h' или '5/15m'."""
+        match = _RATE_RE.match(value)
+        if match is None:
+            raise ImproperlyConfigured(f"Некорректный лимит {value!r}, ожидается, например, '10/m'")
+        count, multiplier, unit = match.groups()
+        period = int(multiplier or 1) * _PERIODS[unit]
+        return cls(capacity=int(count), per_second=int(count) / period)
+
+
+class BucketStore:
+    """Корзины и счётчики отказов в файле SQLite, общем для процессов."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._next_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Подключение своё у каждого потока и процесса: после fork
+        # унаследованное подключение использовать нельзя
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+        # Данные ограничителя не ценны: WAL без fsync
+        connection.executescript('PRAGMA journal_mode=WAL; PRAGMA synchronous=OFF;' + _SCHEMA)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def hit(self, key: str, rate: Rate, counter: str, now: float | None = None) -> float:
+        """
+        Забирает токен из корзины key. Возвращает 0, если запрос разрешён,
+        иначе — через сколько секунд появится следующий токен (отказ
+        учитывается в счётчике counter).
+        """
+        now = time.time() if now is None else now
+        connection = self._connection()
+        # BEGIN IMMEDIATE: чтение и запись корзины — одна операция для всех процессов
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = float(rate.capacity)
+            if row is not None:
+                tokens = min(tokens, row[0] + max(now - row[1], 0.0) * rate.per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate.per_second
+                connection.execute(
+                    'INSERT INTO rejects (counter, count, last_at) VALUES (?, 1, ?) '
+                    'ON CONFLICT (counter) DO UPDATE SET count = count + 1, last_at = excluded.last_at',
+                    (counter, now),
+                )
+            full_at = now + (rate.capacity - tokens) / rate.per_second
+            connection.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+                (key, tokens, now, full_at),
+            )
+            if now >= self._next_purge:
+                # Полная корзина ничем не отличается от отсутствующей
+                connection.execute('DELETE FROM buckets WHERE full_at <= ?', (now,))
+                self._next_purge = now + _PURGE_INTERVAL
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return wait
+
+    def rejects(self) -> list[tuple[str, int, float]]:
+        """Счётчики отказов: (политика:область, число, время последнего)."""
+        return self._connection().execute(
+            'SELECT counter, count, last_at FROM rejects ORDER BY count DESC, counter'
+        ).fetchall()
+
+    def active_buckets(self) -> int:
+        """Число неполных корзин, то есть клиентов, расходующих лимит."""
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM buckets WHERE full_at > ?', (time.time(),)
+        ).fetchone()[0]
+
+    def reset(self) -> None:
+        """Очищает корзины и счётчики отказов."""
+        self._connection().executescript('DELETE FROM buckets; DELETE FROM rejects;')
+
+
+_store: BucketStore | None = None
+
+
+def get_store() -> BucketStore:
+    global _store
+    path = str(get_config()['DATABASE'])
+    if _store is None or _store.path != path:
+        _store = BucketStore(path)
+    return _store
+
+
+class HttpResponseTooManyRequests(HttpResponse):
+    status_code = 429
+
+
+def client_ip(request: HttpRequest) -> str | None:
+    """Адрес клиента; IPv6-адреса объединяются в сети /64."""
+    value = request.META.get(get_config()['IP_META_KEY'], '')
+    # В X-Forwarded-For последний адрес добавил свой прокси, остальные
+    # мог подставить сам клиент
+    value = value.split(',')[-1].strip()
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return None
+    if address.version == 6:
+        return str(ipaddress.ip_network(f'{address}/64', strict=False))
+    return str(address)
+
+
+def _identity(request: HttpRequest, scope: str, user) -> str | None:
+    if scope == 'ip':
+        return client_ip(request)
+    if scope == 'user':
+        return str(user.pk) if user is not None and user.is_authenticated else None
+    if scope == 'username':
+        username = request.POST.get('username', '').strip().lower()
+        return username[:150] or None
+    raise ImproperlyConfigured(f"Неизвестная область лимита {scope!r}, допустимы: {', '.join(SCOPES)}")
+
+
+def check(request: HttpRequest, policy: str, user=None) -> float:
+    """
+    Применяет политику к запросу. Возвращает 0, если запрос разрешён,
+    иначе — сколько секунд клиенту нужно подождать.
+    """
+    config = get_config()
+    try:
+        rules = config['POLICIES'][policy]
+    except KeyError:
+        raise ImproperlyConfigured(f"Политика ограничения {policy!r} не описана в RATELIMIT['POLICIES']") from None
+    if not config['ENABLED'] or request.META.get(EXEMPT_META_KEY):
+        return 0.0
+    if request.method not in rules.get('methods', ('GET', 'HEAD', 'POST')):
+        return 0.0
+
+    wait = 0.0
+    for scope in SCOPES:
+        if scope not in rules:
+            continue
+        identity = _identity(request, scope, user)
+        if identity is None:
+            continue
+        try:
+            scope_wait = get_store().hit(f'{policy}:{scope}:{identity}', Rate.parse(rules[scope]), f'{policy}:{scope}')
+        except sqlite3.Error:
+            logger.exception("Хранилище ограничителя недоступно, запрос пропущен")
+            return 0.0
+        wait = max(wait, scope_wait)
+    if wait:
+        logger.info("Превышен лимит %s для %s %s", policy, request.method, request.path)
+    return wait
+
+
+def too_many_requests(wait: float) -> HttpResponse:
+    retry_after = max(math.ceil(wait), 1)
+    response = HttpResponseTooManyRequests(
+        f"Слишком много запросов. Повторите через {retry_after} с.",
+        content_type='text/plain; charset=utf-8',
+    )
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(policy: str):
+    """Ограничивает частоту запросов к view политикой из RATELIMIT['POLICIES']."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request: HttpRequest, *args, **kwargs):
+                user = await request.auser() if hasattr(request, 'auser') else None
+                wait = await sync_to_async(check, thread_sensitive=False)(request, policy, user)
+                if wait:
+                    return too_many_requests(wait)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs):
+            wait = check(request, policy, getattr(request, 'user', None))
+            if wait:
+                return too_many_requests(wait)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,62 @@
+"""
+Маршрутизация запросов к базе: чтение из read-only view идёт через
+отдельное подключение ``read``, всё остальное — через ``default``.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+READ_ALIAS = 'read'
+
+_read_only: ContextVar[bool] = ContextVar('read_only_view', default=False)
+
+
+def read_only_view(view):
+    """
+    Помечает view как только читающее: на время его выполнения запросы
+    на чтение уходят в алиас ``read`` (если он настроен).
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            token = _read_only.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _read_only.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+
+class ReadWriteRouter:
+    """Роутер для режима DB_MODE = 'production' (см. core/settings.py)."""
+
+    def db_for_read(self, model, **hints):
+        if not _read_only.get() or READ_ALIAS not in settings.DATABASES:
+            return None
+        # Внутри транзакции читаем через то же подключение, что и пишем,
+        # иначе не увидим собственные незакоммиченные изменения
+        if connections['default'].in_atomic_block:
+            return None
+        return READ_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Оба алиаса смотрят в один и тот же файл базы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
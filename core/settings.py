@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +28,9 @@ DEBUG = True  # Включено для разработки, отключить
 
 ALLOWED_HOSTS = ['makrei.online', 'www.makrei.online', 'localhost', '127.0.0.1']
 
+# Основной адрес сайта: для ссылок, собираемых вне запроса (фоновые задачи)
+SITE_URL = 'https://makrei.online'
+
 
 # Application definition
 
@@ -38,12 +42,15 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'main.apps.MainConfig',
-    'blog',
+    'blog.apps.BlogConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.static.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,6 +61,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'core.urls'
 
+# Асинхронные версии читающих view (index, user_search, user_posts).
+# Включаются автоматически при запуске через core/asgi.py.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -82,6 +93,138 @@ DATABASES = {
     }
 }
 
+# Режим работы SQLite: dev — подключение по умолчанию, production — WAL,
+# настроенные PRAGMA, постоянные подключения и отдельный алиас для чтения.
+# По умолчанию production включается вместе с DEBUG = False.
+DB_MODE = os.environ.get('DJANGO_DB_MODE', 'dev' if DEBUG else 'production')
+
+# WAL позволяет читателям работать параллельно с писателем, synchronous=NORMAL
+# в режиме WAL безопасен и не делает fsync на каждый коммит, mmap и кэш страниц
+# уменьшают число системных вызовов при чтении.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA mmap_size=268435456;'
+    'PRAGMA cache_size=-65536;'
+    'PRAGMA temp_store=MEMORY;'
+)
+
+if DB_MODE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS,
+            # BEGIN IMMEDIATE сразу берёт блокировку записи: транзакция не
+            # падает с "database is locked" при повышении блокировки, а ждёт
+            'transaction_mode': 'IMMEDIATE',
+            # busy_timeout в секундах: сколько ждать освобождения блокировки
+            'timeout': 20,
+        },
+    })
+    # Тот же файл, но подключение только для чтения: сюда роутер отправляет
+    # запросы из view, помеченных core.routers.read_only_view
+    DATABASES['read'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DATABASES['default']['NAME'],
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS + 'PRAGMA query_only=ON;',
+            'timeout': 20,
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['core.routers.ReadWriteRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# По умолчанию кэш хранится в памяти процесса. При нескольких воркерах gunicorn
+# каждый воркер держит свою копию, а сброс по сигналам виден только в том
+# воркере, где изменился пост. Общий кэш включается переменной окружения:
+#   DJANGO_CACHE=file  — файлы в CACHE_DIR;
+#   DJANGO_CACHE=db    — таблица в базе (нужен python manage.py createcachetable).
+
+CACHE_BACKEND = os.environ.get('DJANGO_CACHE', 'locmem')
+CACHE_DIR = BASE_DIR / 'cache'
+
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+elif CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+
+# Профилирование запросов (core.profiling.ProfilingMiddleware):
+# Server-Timing и журнал медленных запросов с SQL и поиском повторов.
+# Включается переменной окружения DJANGO_PROFILING=1.
+
+PROFILING = {
+    'ENABLED': os.environ.get('DJANGO_PROFILING') == '1',
+    # Доля запросов, для которых перехватываются SQL и шаблоны (1.0 — все)
+    'SAMPLE_RATE': 1.0 if DEBUG else 0.05,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_LOG': BASE_DIR / 'logs' / 'slow_requests.log',
+}
+
+
+# Ограничение частоты запросов (core.ratelimit): token bucket в файле SQLite,
+# общем для всех воркеров. Лимит 'N/период' — корзина на N запросов,
+# пополняемая на N за период (s, m, h, d; например '5/15m').
+# Области: ip — адрес клиента, user — вошедший пользователь,
+# username — имя из формы входа.
+
+RATELIMIT = {
+    'ENABLED': os.environ.get('DJANGO_RATELIMIT', '1') == '1',
+    # /dev/shm — файл в памяти; на системах без неё — рядом с проектом
+    'DATABASE': (
+        Path('/dev/shm/makrei_online_ratelimit.sqlite3') if Path('/dev/shm').is_dir()
+        else BASE_DIR / 'ratelimit.sqlite3'
+    ),
+    # За nginx адрес клиента передаётся в заголовке: 'HTTP_X_REAL_IP'
+    'IP_META_KEY': os.environ.get('DJANGO_RATELIMIT_IP_META_KEY', 'REMOTE_ADDR'),
+    'POLICIES': {
+        'login': {'methods': ['POST'], 'ip': '20/m', 'username': '10/15m'},
+        'register': {'methods': ['POST'], 'ip': '5/h'},
+        'user_search': {'ip': '60/m', 'user': '120/m'},
+        'user_autocomplete': {'ip': '300/m', 'user': '600/m'},
+    },
+}
+
+
+# Фоновые задачи (jobs): очередь в базе, выполняет manage.py run_worker.
+# INLINE — выполнять задачи в процессе сайта сразу после фиксации
+# транзакции, без воркера (по умолчанию при DEBUG).
+
+JOBS = {
+    'INLINE': os.environ.get('DJANGO_JOBS_INLINE', '1' if DEBUG else '0') == '1',
+    'BATCH_SIZE': 20,
+    'POLL_INTERVAL': 1.0,
+    'LEASE': 5 * 60,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 2,
+    'BACKOFF_MAX': 10 * 60,
+    'RETENTION': 24 * 60 * 60,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -102,6 +245,32 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Сессии и пользователь без запросов к базе на каждом запросе:
+# сессия читается из кэша (с записью в базу), пользователь — из кэша
+# CachedModelBackend. ModelBackend оставлен для сессий, созданных до
+# включения кэша (в сессии записан путь бэкенда); его можно убрать
+# через SESSION_COOKIE_AGE после выкладки.
+#
+# Кэш в памяти процесса (locmem) у каждого воркера gunicorn свой: выход
+# или смена пароля в одном воркере не сбросили бы запись в других. Поэтому
+# с ним сессии читаются из базы, а CachedModelBackend не кэширует
+# пользователя (manage.py check --deploy предупреждает об этом, main.W002).
+
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.db' if CACHE_BACKEND == 'locmem'
+    else 'django.contrib.sessions.backends.cached_db'
+)
+
+AUTHENTICATION_BACKENDS = [
+    'main.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Алиас кэша и время жизни закэшированного пользователя в секундах
+AUTH_USER_CACHE = 'default'
+AUTH_USER_CACHE_TIMEOUT = 60
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -128,6 +297,21 @@ else:
 
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# collectstatic минифицирует CSS/JS, добавляет хеш содержимого в имена
+# (staticfiles.json) и кладёт рядом копии .gz/.br, см. core/storage.py
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Раздавать STATIC_ROOT самим Django (core.static.StaticFilesMiddleware),
+# если перед gunicorn нет nginx
+SERVE_STATIC = os.environ.get('DJANGO_SERVE_STATIC') == '1'
+
 # Если есть медиа-файлы
 if DEBUG:
     MEDIA_ROOT = BASE_DIR / 'media'  # Для разработки
@@ -141,3 +325,56 @@ MEDIA_URL = '/media/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+
+# Блог
+# Количество постов на одной странице ленты (курсорная пагинация)
+BLOG_PAGE_SIZE = 20
+# Количество результатов на одной странице поиска пользователей
+SEARCH_PAGE_SIZE = 20
+
+# Сжатие текстов постов на SQLite (blog/compression.py): 'zlib', 'zstd'
+# (нужен пакет zstandard) или None — новые тексты не сжимаются. Тексты
+# короче порога в байтах хранятся как есть.
+BLOG_CONTENT_COMPRESSION = 'zstd'
+BLOG_CONTENT_COMPRESSION_MIN_LENGTH = 512
+
+# Кэш карточек постов: алиас из CACHES и время жизни записи в секундах
+POST_CARD_CACHE = 'default'
+POST_CARD_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Atom/RSS-ленты авторов: число постов, алиас кэша, время жизни тела
+# в кэше и max-age для читалок в секундах
+BLOG_FEED_SIZE = 20
+BLOG_FEED_CACHE = 'default'
+BLOG_FEED_CACHE_TIMEOUT = 24 * 60 * 60
+BLOG_FEED_MAX_AGE = 5 * 60
+
+# Домашняя лента (blog/timeline.py): посты авторов, у которых подписчиков
+# или постов не меньше порога, не раскладываются по лентам при записи,
+# а подмешиваются при чтении. При подписке в ленту добавляется
+# BLOG_TIMELINE_BACKFILL последних постов автора.
+BLOG_TIMELINE_FANOUT_MAX_FOLLOWERS = 2000
+BLOG_TIMELINE_PROLIFIC_POSTS = 5000
+BLOG_TIMELINE_BACKFILL = 200
+
+# Автодополнение в поиске пользователей: индекс префиксов в памяти процесса
+AUTOCOMPLETE_LIMIT = 10
+# Сколько пользователей держать в индексе (остальные ищутся в базе)
+AUTOCOMPLETE_MAX_USERS = 100_000
+# Полная перестройка индекса, чтобы подхватить изменения других воркеров
+AUTOCOMPLETE_TTL = 5 * 60
+AUTOCOMPLETE_MAX_AGE = 30
+
+# Кэш страниц для анонимных посетителей (core.page_cache): алиас из CACHES
+# и время жизни страницы в секундах
+PAGE_CACHE = 'default'
+PAGE_CACHE_TIMEOUT = 5 * 60
+
+# Сколько строк максимум считает пагинатор списка постов в админке
+ADMIN_COUNT_LIMIT = 10_000
+
+# Максимум операций в одном запросе к пакетному API постов (blog/api.py)
+BLOG_BATCH_MAX_OPERATIONS = 500
+
+# Адреса, которые main.warmup запрашивает при прогреве воркера
+WARMUP_URLS = ['/', '/users/search/']
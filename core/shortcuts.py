@@ -0,0 +1,15 @@
+"""Вспомогательные функции для асинхронных view."""
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import render
+
+
+async def arender(request: HttpRequest, template_name: str, context: dict | None = None) -> HttpResponse:
+    """
+    Асинхронная обёртка над render().
+
+    Шаблоны и контекстные процессоры (auth, messages) могут лениво
+    обращаться к сессии и базе, поэтому отрисовка выполняется в потоке
+    через sync_to_async, а не в цикле событий.
+    """
+    return await sync_to_async(render)(request, template_name, context)
@@ -0,0 +1,154 @@
+"""
+Раздача собранной статики самим Django — для установок без nginx.
+
+StaticFilesMiddleware отвечает на запросы к STATIC_URL файлами из
+STATIC_ROOT, не доходя до URLconf, сессий и авторизации. Если клиент
+принимает br или gzip и рядом лежит заранее сжатая копия (её создаёт
+core.storage.CompressedManifestStaticFilesStorage), отдаётся она.
+Файлы с хешем в имени (из манифеста) отдаются с
+``Cache-Control: public, max-age=31536000, immutable``, остальные —
+с коротким max-age и перепроверкой по Last-Modified.
+
+Включается настройкой SERVE_STATIC (переменная DJANGO_SERVE_STATIC=1).
+Содержимое небольших файлов держится в памяти процесса.
+"""
+import mimetypes
+import os
+import posixpath
+import stat
+import threading
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse, HttpResponseNotAllowed
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MUTABLE_CACHE_CONTROL = 'public, max-age=60'
+
+# Порядок предпочтения заранее сжатых копий
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Файлы больше этого размера читаются с диска на каждый запрос
+MAX_CACHED_FILE_SIZE = 512 * 1024
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    body: bytes
+    mtime: float
+
+
+class StaticFilesMiddleware:
+    """Отдаёт файлы из STATIC_ROOT с заранее сжатыми вариантами."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVE_STATIC', False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+        self._files: dict[str, StaticFile] = {}
+        self._lock = threading.Lock()
+        self._immutable = self._hashed_names()
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request: HttpRequest):
+        # Файлы небольшие и почти всегда уже в памяти: чтение без перехода в поток
+        response = self.serve(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def serve(self, request: HttpRequest) -> HttpResponse | None:
+        """Ответ для запроса к статике или None, если это не статика."""
+        if not request.path.startswith(self.prefix):
+            return None
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        name = posixpath.normpath(request.path[len(self.prefix):]).lstrip('/')
+        try:
+            path = safe_join(self.root, name)
+        except ValueError:
+            return HttpResponse(status=404)
+        original = self._load(path)
+        if original is None:
+            return HttpResponse(status=404)
+
+        response = get_conditional_response(request, last_modified=int(original.mtime))
+        if response is None:
+            encoding, static_file = self._choose_variant(request, path, original)
+            response = HttpResponse(
+                b'' if request.method == 'HEAD' else static_file.body,
+                content_type=_content_type(name),
+            )
+            response.headers['Content-Length'] = len(static_file.body)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+            response.headers['Last-Modified'] = http_date(int(original.mtime))
+        patch_vary_headers(response, ['Accept-Encoding'])
+        immutable = name in self._immutable
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL
+        return response
+
+    def _choose_variant(self, request: HttpRequest, path: str, original: StaticFile) -> tuple[str | None, StaticFile]:
+        accepted = {
+            part.split(';')[0].strip().lower()
+            for part in request.headers.get('Accept-Encoding', '').split(',')
+        }
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted:
+                compressed = self._load(path + suffix)
+                if compressed is not None:
+                    return encoding, compressed
+        return None, original
+
+    def _load(self, path: str) -> StaticFile | None:
+        try:
+            info = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(info.st_mode):
+            return None
+        cached = self._files.get(path)
+        if cached is not None and cached.mtime == info.st_mtime:
+            return cached
+        with open(path, 'rb') as source:
+            static_file = StaticFile(body=source.read(), mtime=info.st_mtime)
+        if info.st_size <= MAX_CACHED_FILE_SIZE:
+            with self._lock:
+                self._files[path] = static_file
+        return static_file
+
+    @staticmethod
+    def _hashed_names() -> set[str]:
+        """Имена файлов с хешем из манифеста collectstatic."""
+        hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+        if not hashed_files:
+            return set()
+        return set(hashed_files.values())
+
+
+def _content_type(name: str) -> str:
+    content_type, _ = mimetypes.guess_type(name)
+    content_type = content_type or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'image/svg+xml'):
+        content_type += '; charset=utf-8'
+    return content_type
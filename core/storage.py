@@ -0,0 +1,123 @@
+"""
+Хранилище статики для collectstatic: минификация, хеши в именах
+и заранее сжатые копии.
+
+CompressedManifestStaticFilesStorage — это ManifestStaticFilesStorage,
+который дополнительно:
+
+* минифицирует CSS (встроенным консервативным минификатором) и JS
+  (rjsmin, если установлен) при записи. Хеш в имени файла Django считает
+  до записи, поэтому file_hash минифицирует содержимое сам: хеш
+  соответствует байтам, которые лежат на диске;
+* после расстановки хешей кладёт рядом с каждым текстовым файлом
+  ``.gz`` и ``.br`` (если установлен пакет brotli), если сжатая копия
+  действительно меньше.
+
+Готовые копии отдаёт nginx (gzip_static / brotli_static) или
+core.static.StaticFilesMiddleware.
+"""
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli необязателен
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - rjsmin необязателен
+    rjsmin = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.txt', '.xml', '.json', '.html', '.map')
+
+# Файлы меньше этого размера не сжимаются: выигрыш меньше заголовков
+MIN_COMPRESS_SIZE = 256
+
+# Уже минифицированные файлы, в том числе с хешем в имени: select2.min.9f54e6414f87.css
+_MINIFIED_RE = re.compile(r'\.min(\.[0-9a-f]{12})?\.(css|js)$')
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(text: str) -> str:
+    """
+    Консервативная минификация CSS: комментарии, переводы строк и пробелы
+    вокруг {};,> — без переписывания значений и селекторов.
+    """
+    text = _CSS_COMMENT_RE.sub('', text)
+    text = _CSS_SPACE_RE.sub(' ', text)
+    text = _CSS_PUNCTUATION_RE.sub(r'\1', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text: str) -> str:
+    """Минификация JS через rjsmin; без него файл остаётся как есть."""
+    if rjsmin is not None:
+        return rjsmin.jsmin(text)
+    return text
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+def _minified(name: str | None, content) -> ContentFile | None:
+    """Минифицированная копия файла или None, если минифицировать не нужно."""
+    if name is None:
+        # Так Django хеширует сам манифест (save_manifest)
+        return None
+    minifier = next((func for ext, func in MINIFIERS.items() if name.endswith(ext)), None)
+    if minifier is None or _MINIFIED_RE.search(name):
+        return None
+    content.seek(0)
+    text = content.read()
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    return ContentFile(minifier(text).encode('utf-8'))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage с минификацией и копиями .gz/.br."""
+
+    def _save(self, name, content):
+        return super()._save(name, _minified(name, content) or content)
+
+    def file_hash(self, name, content=None):
+        if content is not None:
+            content = _minified(name, content) or content
+        return super().file_hash(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in paths:
+            hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+            for target in filter(None, {name, hashed_name}):
+                if target.endswith(COMPRESSIBLE_EXTENSIONS):
+                    self._compress(target)
+
+    def _compress(self, name: str) -> None:
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        # mtime=0: одинаковый файл даёт одинаковый архив при каждой сборке
+        variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(data, quality=11)
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            # В обход _save: сжатые копии не минифицируются и не хешируются
+            super()._save(name + suffix, ContentFile(compressed))
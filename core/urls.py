@@ -18,19 +18,41 @@ from django.contrib import admin
 from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
-from main.views import index, register, login_view, logout_view
-from blog.views import post_list, post_create, post_edit, post_delete, user_search, user_posts
+from main import async_views as main_async_views, views as main_sync_views
+from main.views import register, login_view, logout_view
+from blog import async_views as blog_async_views, views as blog_sync_views
+from blog.api import post_batch
+from blog.views import (
+    post_list, post_list_page, post_create, post_edit, post_delete,
+    user_autocomplete, user_feed, post_card_cache_stats,
+    home_timeline, timeline_page, follow_user, unfollow_user,
+)
+
+# Под ASGI читающие страницы обслуживаются асинхронными view
+main_views = main_async_views if settings.ASYNC_VIEWS else main_sync_views
+blog_views = blog_async_views if settings.ASYNC_VIEWS else blog_sync_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', index, name='index'),
+    path('', main_views.index, name='index'),
     path('register/', register, name='register'),
     path('blog/', post_list, name='blog'),
+    path('blog/page/', post_list_page, name='post_list_page'),
+    path('blog/cache-stats/', post_card_cache_stats, name='post_card_cache_stats'),
+    path('blog/api/batch/', post_batch, name='post_batch'),
     path('blog/create/', post_create, name='post_create'),
     path('blog/<int:post_id>/edit/', post_edit, name='post_edit'),
     path('blog/<int:post_id>/delete/', post_delete, name='post_delete'),
-    path('users/search/', user_search, name='user_search'),
-    path('users/<str:username>/', user_posts, name='user_posts'),
+    path('timeline/', home_timeline, name='timeline'),
+    path('timeline/page/', timeline_page, name='timeline_page'),
+    path('users/search/', blog_views.user_search, name='user_search'),
+    path('users/autocomplete/', user_autocomplete, name='user_autocomplete'),
+    path('users/<str:username>/', blog_views.user_posts, name='user_posts'),
+    path('users/<str:username>/page/', blog_views.user_posts_page, name='user_posts_page'),
+    path('users/<str:username>/follow/', follow_user, name='follow_user'),
+    path('users/<str:username>/unfollow/', unfollow_user, name='unfollow_user'),
+    path('users/<str:username>/feed.xml', user_feed, {'kind': 'atom'}, name='user_feed_atom'),
+    path('users/<str:username>/rss.xml', user_feed, {'kind': 'rss'}, name='user_feed_rss'),
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
 ]
@@ -0,0 +1,39 @@
+"""
+Настройки gunicorn для makrei_online.
+
+gunicorn читает ./gunicorn.conf.py из рабочего каталога службы сам, так
+что ExecStart менять не нужно; адрес и число воркеров по-прежнему задаются
+в unit-файле. Здесь — то, что нужно для выкладки без простоя:
+
+* каждый воркер прогревается (main.warmup) в post_worker_init, то есть
+  до того, как начнёт принимать соединения;
+* update_project.sh шлёт мастеру HUP: он запускает новых воркеров с
+  новым кодом, а старые дообслуживают свои запросы (graceful_timeout)
+  и выходят. Соединения на сокете при этом не теряются.
+
+preload_app выключен намеренно: с ним код приложения загружает мастер,
+и по HUP новые воркеры форкаются со старым кодом. Выигрыш preload (общая
+память и быстрый форк) здесь меньше, чем цена полного рестарта на
+каждую выкладку, а время импорта скрывает прогрев до приёма запросов.
+"""
+import os
+import time
+
+preload_app = False
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+
+def post_worker_init(worker):
+    started = time.perf_counter()
+    from main.warmup import warm_up
+
+    timings = warm_up()
+    steps = ', '.join(f"{name} {elapsed * 1000:.0f} мс" for name, elapsed in timings.items())
+    worker.log.info(
+        "Воркер %s прогрет за %.2f с (с запуска %.2f с): %s",
+        worker.pid, time.perf_counter() - started, time.time() - worker.booted_at, steps,
+    )
+
+
+def pre_fork(server, worker):
+    worker.booted_at = time.time()
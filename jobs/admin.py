@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("name", "key", "status", "attempts", "run_at", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("key",)
+    ordering = ("-id",)
+    readonly_fields = (
+        "name", "key", "payload", "attempts", "max_attempts", "created_at",
+        "started_at", "finished_at", "locked_by", "locked_until", "last_error",
+    )
+    show_full_result_count = False
+
+    def has_add_permission(self, request) -> bool:
+        # Задачи ставит код через jobs.queue.enqueue
+        return False
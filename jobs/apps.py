@@ -0,0 +1,15 @@
+"""Конфигурация приложения jobs."""
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    """Конфигурация приложения jobs."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+    verbose_name = 'Фоновые задачи'
+
+    def ready(self) -> None:
+        # Регистрируем обработчики задач из модулей tasks.py приложений
+        autodiscover_modules('tasks')
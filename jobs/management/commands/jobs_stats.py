@@ -0,0 +1,66 @@
+"""Состояние очереди фоновых задач: глубина, задержка и пропускная способность."""
+import statistics
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Показывает очередь задач, задержку и пропускную способность по именам задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=15, help="Окно для пропускной способности, минуты")
+        parser.add_argument('--requeue-failed', action='store_true', help="Вернуть проваленные задачи в очередь")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options['requeue_failed']:
+            count = 0
+            for job in Job.objects.filter(status=Job.FAILED).only('key'):
+                # Проваленная задача с ключом, который уже ждёт в очереди, не нужна
+                if job.key and Job.objects.filter(key=job.key, status=Job.QUEUED).exists():
+                    job.delete()
+                    continue
+                Job.objects.filter(pk=job.pk).update(status=Job.QUEUED, attempts=0, run_at=now)
+                count += 1
+            self.stdout.write(self.style.SUCCESS(f"Возвращено в очередь: {count}"))
+            return
+
+        counts = {
+            (row['name'], row['status']): row['count']
+            for row in Job.objects.values('name', 'status').annotate(count=Count('id'))
+        }
+        oldest = dict(
+            Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+            .values('name').annotate(oldest=Min('created_at')).values_list('name', 'oldest')
+        )
+        window = timedelta(minutes=options['window'])
+        finished = {}
+        for name, created_at, started_at in (
+            Job.objects.filter(status=Job.DONE, finished_at__gte=now - window)
+            .values_list('name', 'created_at', 'started_at')
+        ):
+            finished.setdefault(name, []).append((started_at - created_at).total_seconds())
+
+        names = sorted({name for name, _ in counts})
+        if not names:
+            self.stdout.write("Очередь пуста")
+            return
+        self.stdout.write(
+            f"{'задача':<24} {'ждут':>6} {'идут':>6} {'ошибки':>6} {'задач/мин':>10} "
+            f"{'задержка p50':>13} {'p95':>8} {'старейшая':>10}"
+        )
+        for name in names:
+            lags = sorted(finished.get(name, []))
+            p50 = f"{statistics.median(lags):.2f} с" if lags else '-'
+            p95 = f"{lags[min(int(len(lags) * 0.95), len(lags) - 1)]:.2f} с" if lags else '-'
+            waiting = f"{(now - oldest[name]).total_seconds():.0f} с" if name in oldest else '-'
+            self.stdout.write(
+                f"{name:<24} {counts.get((name, Job.QUEUED), 0):>6} {counts.get((name, Job.RUNNING), 0):>6} "
+                f"{counts.get((name, Job.FAILED), 0):>6} {len(lags) / options['window']:>10.1f} "
+                f"{p50:>13} {p95:>8} {waiting:>10}"
+            )
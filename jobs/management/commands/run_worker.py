@@ -0,0 +1,32 @@
+"""Воркер очереди фоновых задач (см. jobs/worker.py)."""
+import logging
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Выполняет фоновые задачи из очереди в базе"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Задач, забираемых за раз")
+        parser.add_argument('--poll-interval', type=float, help="Пауза при пустой очереди, секунды")
+        parser.add_argument('--burst', action='store_true', help="Выйти, когда очередь опустеет")
+        parser.add_argument('--max-jobs', type=int, help="Выйти после стольких задач")
+
+    def handle(self, *args, **options):
+        if options['verbosity'] >= 1 and not logging.getLogger('jobs').handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+            logging.getLogger('jobs').addHandler(handler)
+            logging.getLogger('jobs').setLevel(logging.INFO)
+
+        worker = Worker(batch_size=options['batch_size'], poll_interval=options['poll_interval'])
+        # systemd останавливает службу SIGTERM: текущая задача доделывается
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        self.stderr.write(f"Воркер {worker.name} запущен")
+        processed = worker.run(burst=options['burst'], max_jobs=options['max_jobs'])
+        self.stdout.write(self.style.SUCCESS(f"Воркер остановлен, выполнено задач: {processed}; {worker.stats.report()}"))
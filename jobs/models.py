@@ -0,0 +1,58 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Фоновая задача в очереди (см. jobs/queue.py).
+
+    Строка добавляется в той же транзакции, что и изменение, которое её
+    породило, поэтому задача не теряется и не появляется без него.
+    Выполненные задачи хранятся JOBS['RETENTION'] секунд для метрик.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    ]
+
+    name = models.CharField("Задача", max_length=100)
+    # Задачи с одинаковым ключом, ещё ждущие в очереди, объединяются в одну
+    key = models.CharField("Ключ объединения", max_length=200, null=True, blank=True)
+    payload = models.JSONField("Аргументы", default=dict, blank=True)
+    status = models.CharField("Статус", max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveIntegerField("Попыток", default=0)
+    max_attempts = models.PositiveIntegerField("Максимум попыток", default=5)
+    run_at = models.DateTimeField("Выполнить не раньше", default=timezone.now)
+    created_at = models.DateTimeField("Дата постановки", auto_now_add=True)
+    started_at = models.DateTimeField("Начало выполнения", null=True, blank=True)
+    finished_at = models.DateTimeField("Окончание выполнения", null=True, blank=True)
+    # Воркер, взявший задачу, и срок аренды: по его истечении задачу
+    # считают брошенной (воркер упал) и выполняют заново
+    locked_by = models.CharField("Воркер", max_length=100, blank=True, default='')
+    locked_until = models.DateTimeField("Аренда до", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True, default='')
+
+    class Meta:
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=Q(status='queued'),
+                name='jobs_job_unique_queued_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['status', 'finished_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk}"
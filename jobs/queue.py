@@ -0,0 +1,93 @@
+"""
+Очередь фоновых задач в базе данных, без брокера.
+
+Обработчик регистрируется декоратором ``@job('имя')`` в модуле tasks.py
+приложения и получает аргументы задачи именованными параметрами.
+enqueue() добавляет строку Job в текущую транзакцию: запрос на запись
+фиксирует изменение вместе с задачей и сразу отвечает, а побочные
+эффекты выполняет ``manage.py run_worker`` (jobs/worker.py).
+
+Доставка — как минимум один раз: задача, воркер которой упал, снова
+выполняется по истечении аренды, поэтому обработчики должны быть
+идемпотентными (например, «привести индекс поста к состоянию в базе»).
+Задачи с одинаковым ключом, ещё ждущие в очереди, объединяются: второй
+enqueue с тем же ключом ничего не добавляет.
+
+В режиме JOBS['INLINE'] (по умолчанию при DEBUG) задача выполняется
+в том же процессе сразу после фиксации транзакции — для разработки
+без запущенного воркера.
+"""
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('jobs')
+
+DEFAULTS = {
+    'INLINE': False,
+    # Сколько задач воркер берёт за один раз
+    'BATCH_SIZE': 20,
+    # Пауза воркера при пустой очереди, секунды
+    'POLL_INTERVAL': 1.0,
+    # Аренда задачи: после неё задачу упавшего воркера берёт другой
+    'LEASE': 5 * 60,
+    'MAX_ATTEMPTS': 5,
+    # Повтор после ошибки: BACKOFF_BASE * 2 ** (попытка - 1), не больше BACKOFF_MAX
+    'BACKOFF_BASE': 2,
+    'BACKOFF_MAX': 10 * 60,
+    # Сколько секунд хранить выполненные задачи (для метрик)
+    'RETENTION': 24 * 60 * 60,
+}
+
+registry: dict[str, Callable] = {}
+
+
+def get_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, 'JOBS', {})}
+
+
+def job(name: str):
+    """Регистрирует функцию как обработчик задачи name."""
+    def decorator(func: Callable) -> Callable:
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name: str, payload: dict | None = None, key: str | None = None,
+            delay: float = 0, using: str | None = None) -> None:
+    """
+    Ставит задачу в очередь в текущей транзакции.
+
+    key — ключ объединения: пока задача с тем же ключом ждёт в очереди,
+    новая не добавляется. delay — через сколько секунд её выполнить.
+    """
+    if name not in registry:
+        raise KeyError(f"Обработчик задачи {name!r} не зарегистрирован")
+    payload = payload or {}
+    config = get_config()
+    if config['INLINE']:
+        transaction.on_commit(lambda: run(name, payload), using=using, robust=True)
+        return
+    Job.objects.using(using).bulk_create(
+        [Job(
+            name=name,
+            key=key,
+            payload=payload,
+            max_attempts=config['MAX_ATTEMPTS'],
+            run_at=timezone.now() + timedelta(seconds=delay),
+        )],
+        # Конфликт по частичному уникальному индексу — задача уже ждёт
+        ignore_conflicts=True,
+    )
+
+
+def run(name: str, payload: dict) -> None:
+    """Выполняет обработчик задачи name."""
+    registry[name](**payload)
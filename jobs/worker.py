@@ -0,0 +1,188 @@
+"""
+Воркер очереди задач (запускается командой ``manage.py run_worker``).
+
+Воркер пачкой берёт готовые задачи — ждущие в очереди и брошенные
+упавшими воркерами (истекла аренда), — помечает их своими в одной
+короткой транзакции и выполняет по одной. Успешная задача помечается
+выполненной, упавшая возвращается в очередь с экспоненциальной
+задержкой, а после JOBS['MAX_ATTEMPTS'] попыток остаётся со статусом
+failed до ручного перезапуска (``manage.py jobs_stats --requeue-failed``).
+"""
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .queue import get_config, registry
+
+logger = logging.getLogger('jobs.worker')
+
+# Как часто воркер пишет метрики в журнал и чистит старые задачи, секунды
+_HOUSEKEEPING_INTERVAL = 60
+
+
+@dataclass
+class WorkerStats:
+    """Счётчики воркера с последнего отчёта."""
+    started: float = field(default_factory=time.monotonic)
+    done: int = 0
+    failed: int = 0
+    lag_total: float = 0.0
+    lag_max: float = 0.0
+
+    def record(self, job: Job, ok: bool) -> None:
+        if ok:
+            self.done += 1
+        else:
+            self.failed += 1
+        lag = (job.started_at - job.created_at).total_seconds()
+        self.lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        processed = self.done + self.failed
+        lag_avg = self.lag_total / processed if processed else 0.0
+        return (
+            f"выполнено {self.done}, ошибок {self.failed}, {processed / elapsed:.1f} задач/с, "
+            f"задержка средняя {lag_avg:.2f} с, максимальная {self.lag_max:.2f} с"
+        )
+
+
+class Worker:
+    def __init__(self, batch_size: int | None = None, poll_interval: float | None = None):
+        self.config = get_config()
+        self.batch_size = batch_size or self.config['BATCH_SIZE']
+        self.poll_interval = self.config['POLL_INTERVAL'] if poll_interval is None else poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = WorkerStats()
+        self.total_processed = 0
+        self.stopping = False
+        self._next_housekeeping = time.monotonic() + _HOUSEKEEPING_INTERVAL
+
+    def stop(self, *args) -> None:
+        """Остановка после текущей задачи (обработчик SIGTERM/SIGINT)."""
+        self.stopping = True
+
+    def run(self, burst: bool = False, max_jobs: int | None = None) -> int:
+        """
+        Выполняет задачи до остановки. burst — выйти, когда очередь опустеет.
+        Возвращает число выполненных задач.
+        """
+        while not self.stopping:
+            # Долгоживущий процесс: закрываем устаревшие подключения, как после запроса
+            close_old_connections()
+            jobs = self.claim()
+            for job in jobs:
+                if self.stopping:
+                    self.release(job)
+                    continue
+                self.execute(job)
+                self.total_processed += 1
+                if max_jobs is not None and self.total_processed >= max_jobs:
+                    self.stopping = True
+            if time.monotonic() >= self._next_housekeeping:
+                self.housekeeping()
+            if not jobs:
+                if burst:
+                    break
+                time.sleep(self.poll_interval)
+        return self.total_processed
+
+    def claim(self) -> list[Job]:
+        """Забирает пачку готовых задач: ждущих и с истёкшей арендой."""
+        now = timezone.now()
+        with transaction.atomic():
+            # Попытка считается при взятии: задача, роняющая воркер, после
+            # последней попытки остаётся с истёкшей арендой и проваливается здесь
+            Job.objects.filter(
+                status=Job.RUNNING, locked_until__lt=now, attempts__gte=F('max_attempts'),
+            ).update(
+                status=Job.FAILED, locked_until=None, finished_at=now,
+                last_error="Аренда истекла после последней попытки: воркер остановился или упал",
+            )
+            ids = list(
+                Job.objects.filter(
+                    Q(status=Job.QUEUED, run_at__lte=now) |
+                    Q(status=Job.RUNNING, locked_until__lt=now, attempts__lt=F('max_attempts'))
+                ).order_by('run_at').values_list('pk', flat=True)[:self.batch_size]
+            )
+            if not ids:
+                return []
+            Job.objects.filter(pk__in=ids).update(
+                status=Job.RUNNING,
+                attempts=F('attempts') + 1,
+                locked_by=self.name,
+                locked_until=now + timedelta(seconds=self.config['LEASE']),
+                started_at=now,
+            )
+            jobs = list(Job.objects.filter(pk__in=ids).order_by('run_at'))
+        return jobs
+
+    def execute(self, job: Job) -> bool:
+        handler = registry.get(job.name)
+        try:
+            if handler is None:
+                raise LookupError(f"Обработчик задачи {job.name!r} не зарегистрирован")
+            handler(**job.payload)
+        except Exception:
+            logger.exception("Задача %s #%s (попытка %s) завершилась ошибкой", job.name, job.pk, job.attempts)
+            self.stats.record(job, ok=False)
+            self.fail(job, traceback.format_exc())
+            return False
+        self.stats.record(job, ok=True)
+        Job.objects.filter(pk=job.pk, locked_by=self.name).update(
+            status=Job.DONE, finished_at=timezone.now(), locked_until=None,
+        )
+        return True
+
+    def fail(self, job: Job, error: str) -> None:
+        """Возвращает задачу в очередь с задержкой или помечает как проваленную."""
+        now = timezone.now()
+        update = {'last_error': error, 'locked_until': None, 'finished_at': now}
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(status=Job.FAILED, **update)
+            return
+        with transaction.atomic():
+            if job.key and Job.objects.filter(key=job.key, status=Job.QUEUED).exists():
+                # Такая же задача уже снова в очереди и выполнит ту же работу
+                Job.objects.filter(pk=job.pk).update(status=Job.DONE, **update)
+                return
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, run_at=now + timedelta(seconds=self.backoff(job.attempts)), **update,
+            )
+
+    def release(self, job: Job) -> None:
+        """Возвращает невыполненную задачу при остановке воркера."""
+        with transaction.atomic():
+            if job.key and Job.objects.filter(key=job.key, status=Job.QUEUED).exists():
+                Job.objects.filter(pk=job.pk).update(status=Job.DONE, finished_at=timezone.now(), locked_until=None)
+            else:
+                # Задача не выполнялась, попытка не считается
+                Job.objects.filter(pk=job.pk).update(
+                    status=Job.QUEUED, attempts=F('attempts') - 1, locked_until=None,
+                )
+
+    def backoff(self, attempts: int) -> float:
+        """Экспоненциальная задержка с разбросом, чтобы повторы не шли волной."""
+        delay = min(self.config['BACKOFF_BASE'] * 2 ** (attempts - 1), self.config['BACKOFF_MAX'])
+        return delay * random.uniform(0.5, 1.0)
+
+    def housekeeping(self) -> None:
+        """Пишет метрики в журнал и удаляет выполненные задачи старше RETENTION."""
+        logger.info("Воркер %s: %s", self.name, self.stats.report())
+        self.stats = WorkerStats()
+        Job.objects.filter(
+            status=Job.DONE,
+            finished_at__lt=timezone.now() - timedelta(seconds=self.config['RETENTION']),
+        ).delete()
+        self._next_housekeeping = time.monotonic() + _HOUSEKEEPING_INTERVAL
@@ -9,3 +9,7 @@ class MainConfig(AppConfig):
     name = 'main'
     verbose_name = 'Основное приложение'
 
+    def ready(self) -> None:
+        # Регистрируем системные проверки и обработчики сигналов
+        from . import checks, signals  # noqa: F401
+
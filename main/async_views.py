@@ -0,0 +1,13 @@
+"""Асинхронные версии view приложения main (используются под ASGI)."""
+from django.http import HttpRequest, HttpResponse
+
+from core.page_cache import anonymous_page_cache
+from core.routers import read_only_view
+from core.shortcuts import arender
+
+
+@anonymous_page_cache('index')
+@read_only_view
+async def index(request: HttpRequest) -> HttpResponse:
+    """Возвращает главную страницу сайта (index) через шаблон."""
+    return await arender(request, "index.html")
@@ -0,0 +1,77 @@
+"""
+Бэкенд аутентификации с кэшированием пользователя.
+
+AuthenticationMiddleware на каждом запросе с сессией загружает
+пользователя по id из сессии. CachedModelBackend берёт его из кэша
+(AUTH_USER_CACHE, по умолчанию 'default') на AUTH_USER_CACHE_TIMEOUT
+секунд. Запись сбрасывается сигналами (main/signals.py) при сохранении
+и удалении пользователя и при выходе, поэтому смена пароля, блокировка
+и правка профиля видны сразу. Кэш в памяти процесса не общий для
+воркеров, поэтому с ним пользователь не кэшируется (см. DJANGO_CACHE).
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import PermissionDenied
+
+_USER_KEY = 'auth:user:{}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE', 'default')]
+
+
+def get_timeout() -> int:
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def is_cache_shared() -> bool:
+    """Виден ли кэш пользователей всем процессам сайта."""
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def invalidate(user_id) -> None:
+    """Удаляет пользователя из кэша."""
+    get_cache().delete(_USER_KEY.format(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который кэширует пользователя для get_user()."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and username is not None and password is not None:
+            # Не передаём неверный пароль следующему бэкенду из
+            # AUTHENTICATION_BACKENDS: ModelBackend проверил бы его ещё раз
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        if not is_cache_shared():
+            return super().get_user(user_id)
+        key = _USER_KEY.format(user_id)
+        cache = get_cache()
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = get_user_model()._default_manager.get(pk=user_id)
+            except get_user_model().DoesNotExist:
+                return None
+            cache.set(key, user, get_timeout())
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        if not is_cache_shared():
+            return await super().aget_user(user_id)
+        key = _USER_KEY.format(user_id)
+        cache = get_cache()
+        user = await cache.aget(key)
+        if user is None:
+            try:
+                user = await get_user_model()._default_manager.aget(pk=user_id)
+            except get_user_model().DoesNotExist:
+                return None
+            await cache.aset(key, user, get_timeout())
+        return user if self.user_can_authenticate(user) else None
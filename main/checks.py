@@ -0,0 +1,49 @@
+"""Системные проверки приложения main."""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+from django.utils.module_loading import import_string
+
+from .backends import is_cache_shared
+
+
+@register(Tags.async_support)
+def check_async_middleware(app_configs, **kwargs):
+    """Под ASGI все middleware должны уметь работать асинхронно."""
+    if not getattr(settings, 'ASYNC_VIEWS', False):
+        return []
+    warnings = []
+    for path in settings.MIDDLEWARE:
+        middleware = import_string(path)
+        if not getattr(middleware, 'async_capable', False):
+            warnings.append(Warning(
+                f"Middleware {path} не поддерживает async: под ASGI каждый запрос "
+                "будет переключаться в поток на этом middleware.",
+                hint="Добавьте async_capable = True и асинхронную ветку __call__.",
+                id='main.W001',
+            ))
+    return warnings
+
+
+@register(Tags.caches, deploy=True)
+def check_session_cache(app_configs, **kwargs):
+    """Сессии и пользователь в кэше памяти процесса не сбрасываются в других воркерах."""
+    warnings = []
+    if not is_cache_shared():
+        warnings.append(Warning(
+            "Кэш AUTH_USER_CACHE хранится в памяти процесса: CachedModelBackend "
+            "загружает пользователя из базы на каждом запросе.",
+            hint="Включите общий кэш: DJANGO_CACHE=file или DJANGO_CACHE=db.",
+            id='main.W002',
+        ))
+    if settings.SESSION_ENGINE.endswith(('.cache', '.cached_db')) and isinstance(
+        caches[settings.SESSION_CACHE_ALIAS], LocMemCache
+    ):
+        warnings.append(Warning(
+            "Сессии хранятся в кэше памяти процесса: после выхода в одном воркере "
+            "сессия остаётся действительной в других.",
+            hint="Включите общий кэш (DJANGO_CACHE) или SESSION_ENGINE = '...sessions.backends.db'.",
+            id='main.W003',
+        ))
+    return warnings
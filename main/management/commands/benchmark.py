@@ -0,0 +1,279 @@
+"""
+Бенчмарк всех маршрутов из core/urls.py.
+
+Каждый маршрут прогоняется через тестовый клиент Django (или через живой
+сервер с --live-url). Для каждого считаются пропускная способность,
+задержки p50/p95/p99, число SQL-запросов на запрос и пиковый RSS процесса.
+Результат пишется в JSON, который можно сравнить с прошлым прогоном:
+
+    python manage.py seed_data --users 200 --posts 100
+    python manage.py benchmark --output before.json
+    # ...изменения...
+    python manage.py benchmark --output after.json --compare before.json
+"""
+import json
+import math
+import platform
+import resource
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from blog.models import Post
+
+# Маршруты, которые меняют состояние сессии и ломают остальные замеры,
+# и маршруты только для POST (на GET они отвечают 405)
+SKIPPED_ROUTES = {'logout', 'post_batch', 'follow_user', 'unfollow_user'}
+
+# Маршруты только для персонала: открываются от имени администратора
+STAFF_ROUTES = {'post_card_cache_stats'}
+
+
+class Command(BaseCommand):
+    help = "Замеряет задержки, запросы к базе и память для всех маршрутов сайта"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Запросов на маршрут")
+        parser.add_argument('--warmup', type=int, default=3, help="Прогревочных запросов на маршрут")
+        parser.add_argument('--prefix', default='bench_', help="Префикс пользователей из seed_data")
+        parser.add_argument('--anonymous', action='store_true', help="Запросы без входа в систему")
+        parser.add_argument('--routes', nargs='*', help="Замерять только эти маршруты (по имени)")
+        parser.add_argument('--live-url', help="Адрес запущенного сервера, например http://127.0.0.1:8000")
+        parser.add_argument('--output', help="Куда записать результаты в JSON")
+        parser.add_argument('--compare', help="JSON прошлого прогона для сравнения")
+
+    def handle(self, *args, **options):
+        user = self._bench_user(options['prefix'])
+        post = Post.objects.filter(user=user).order_by('-created_at').first()
+        if post is None:
+            raise CommandError("У пользователя для бенчмарка нет постов, запустите seed_data")
+
+        client = Client(SERVER_NAME='localhost')
+        # Подключённые URLconf (админка) и STAFF_ROUTES открываются от имени
+        # администратора из seed_data
+        admin_client = None
+        if not options['anonymous']:
+            client.force_login(user)
+            admin = User.objects.filter(username__startswith=options['prefix'], is_superuser=True).first()
+            if admin is not None:
+                admin_client = Client(SERVER_NAME='localhost')
+                admin_client.force_login(admin)
+
+        routes = self._routes(user, post)
+        if options['routes']:
+            routes = [route for route in routes if route[0] in options['routes']]
+        if admin_client is None:
+            # Без администратора страницы персонала отвечают редиректом на вход
+            skipped = sorted(name for name, _, as_admin in routes if as_admin and name in STAFF_ROUTES)
+            if skipped:
+                self.stderr.write(f"Нет администратора из seed_data, пропускаем: {', '.join(skipped)}")
+            routes = [route for route in routes if route[0] not in STAFF_ROUTES]
+
+        results = {}
+        # Замеряется работа view, а не ответы 429 ограничителя частоты
+        # (на сервере из --live-url ограничитель нужно выключить самому:
+        # DJANGO_RATELIMIT=0)
+        with override_settings(RATELIMIT={**settings.RATELIMIT, 'ENABLED': False}):
+            for name, path, as_admin in routes:
+                route_client = admin_client if as_admin and admin_client is not None else client
+                if options['live_url']:
+                    result = self._measure_live(options['live_url'], path, route_client, options)
+                else:
+                    result = self._measure(route_client, path, options)
+                results[name] = result
+                self.stdout.write(self._format_row(name, result))
+
+        report = {
+            'meta': self._meta(options),
+            'routes': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Результаты записаны в {options['output']}"))
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as baseline:
+                self._print_comparison(json.load(baseline), report)
+
+    def _bench_user(self, prefix: str) -> User:
+        """Самый активный пользователь из seed_data: на нём видны проблемы роста."""
+        user = (
+            User.objects.filter(username__startswith=prefix)
+            .annotate(post_count=Count('posts'))
+            .order_by('-post_count')
+            .first()
+        )
+        if user is None:
+            raise CommandError(f"Нет пользователей с префиксом {prefix!r}, запустите seed_data")
+        return user
+
+    def _routes(self, user: User, post: Post) -> list[tuple[str, str, bool]]:
+        """
+        Конкретные адреса для всех маршрутов верхнего уровня из ROOT_URLCONF:
+        имя, путь и признак «открывать от имени администратора»
+        (подключённые URLconf и STAFF_ROUTES).
+        """
+        kwargs_by_param = {'username': user.username, 'post_id': post.pk}
+        routes = []
+        for pattern in get_resolver().url_patterns:
+            if isinstance(pattern, URLResolver):
+                # Подключённые URLconf (админка) замеряются по корневой странице
+                prefix = str(pattern.pattern)
+                if prefix and '<' not in prefix:
+                    routes.append((prefix.strip('/') or prefix, '/' + prefix, True))
+                continue
+            if not isinstance(pattern, URLPattern) or not pattern.name or pattern.name in SKIPPED_ROUTES:
+                continue
+            params = pattern.pattern.converters.keys()
+            if any(param not in kwargs_by_param for param in params):
+                continue
+            kwargs = {param: kwargs_by_param[param] for param in params}
+            path = reverse(pattern.name, kwargs=kwargs)
+            if pattern.name == 'user_search':
+                path += '?q=' + user.first_name[:4]
+            routes.append((pattern.name, path, pattern.name in STAFF_ROUTES))
+        return routes
+
+    def _measure(self, client: Client, path: str, options) -> dict:
+        for _ in range(options['warmup']):
+            client.get(path)
+
+        latencies, queries, statuses = [], [], set()
+        rss_before = _peak_rss_kb()
+        for _ in range(options['requests']):
+            with ExitStack() as stack:
+                captures = [
+                    stack.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in connections
+                ]
+                started = time.perf_counter()
+                response = client.get(path)
+                if getattr(response, 'streaming', False):
+                    b''.join(response.streaming_content)
+                latencies.append(time.perf_counter() - started)
+            queries.append(sum(len(capture) for capture in captures))
+            statuses.add(response.status_code)
+
+        result = _summary(path, latencies, statuses)
+        result['queries'] = statistics.mean(queries)
+        result['peak_rss_kb'] = _peak_rss_kb()
+        result['peak_rss_growth_kb'] = result['peak_rss_kb'] - rss_before
+        return result
+
+    def _measure_live(self, base_url: str, path: str, client: Client, options) -> dict:
+        headers = {}
+        session_cookie = client.cookies.get(settings.SESSION_COOKIE_NAME)
+        if session_cookie:
+            headers['Cookie'] = f"{settings.SESSION_COOKIE_NAME}={session_cookie.value}"
+        url = base_url.rstrip('/') + path
+
+        def fetch() -> int:
+            request = urllib.request.Request(url, headers=headers)
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    return response.status
+            except urllib.error.HTTPError as error:
+                return error.code
+
+        for _ in range(options['warmup']):
+            fetch()
+        latencies, statuses = [], set()
+        for _ in range(options['requests']):
+            started = time.perf_counter()
+            statuses.add(fetch())
+            latencies.append(time.perf_counter() - started)
+
+        result = _summary(path, latencies, statuses)
+        # Запросы к базе и память сервера снаружи не видны
+        result['queries'] = None
+        result['peak_rss_kb'] = None
+        result['peak_rss_growth_kb'] = None
+        return result
+
+    def _meta(self, options) -> dict:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'db_mode': getattr(settings, 'DB_MODE', None),
+            'live_url': options['live_url'],
+            'anonymous': options['anonymous'],
+            'requests_per_route': options['requests'],
+            'users': User.objects.count(),
+            'posts': Post.objects.count(),
+        }
+
+    def _format_row(self, name: str, result: dict) -> str:
+        queries = '-' if result['queries'] is None else f"{result['queries']:.1f}"
+        return (
+            f"{name:<24} {result['throughput_rps']:>8.1f} rps  "
+            f"p50 {result['p50_ms']:>7.2f}  p95 {result['p95_ms']:>7.2f}  p99 {result['p99_ms']:>7.2f} мс  "
+            f"запросов {queries:>5}  статусы {result['statuses']}"
+        )
+
+    def _print_comparison(self, baseline: dict, report: dict) -> None:
+        self.stdout.write(f"\nСравнение с {baseline['meta'].get('commit')} (p50, запросы к базе):")
+        for name, result in report['routes'].items():
+            old = baseline['routes'].get(name)
+            if old is None:
+                self.stdout.write(f"{name:<24} нет в базовом прогоне")
+                continue
+            change = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0.0
+            line = f"{name:<24} p50 {old['p50_ms']:.2f} → {result['p50_ms']:.2f} мс ({change:+.1f}%)"
+            if result['queries'] is not None and old.get('queries') is not None:
+                line += f"  запросов {old['queries']:.1f} → {result['queries']:.1f}"
+            if change > 10:
+                line = self.style.ERROR(line)
+            elif change < -10:
+                line = self.style.SUCCESS(line)
+            self.stdout.write(line)
+
+
+def _summary(path: str, latencies: list[float], statuses: set[int]) -> dict:
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'path': path,
+        'requests': len(ordered),
+        'statuses': sorted(statuses),
+        'throughput_rps': len(ordered) / total if total else 0.0,
+        'p50_ms': _percentile(ordered, 50) * 1000,
+        'p95_ms': _percentile(ordered, 95) * 1000,
+        'p99_ms': _percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """Перцентиль методом ближайшего ранга по отсортированному списку."""
+    rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _peak_rss_kb() -> int:
+    # На Linux ru_maxrss в килобайтах, на macOS — в байтах
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if platform.system() == 'Darwin' else peak
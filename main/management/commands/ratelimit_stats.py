@@ -0,0 +1,31 @@
+"""Счётчики отказов ограничителя частоты запросов (см. core/ratelimit.py)."""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from core.ratelimit import get_config, get_store
+
+
+class Command(BaseCommand):
+    help = "Показывает, сколько запросов отклонил ограничитель, по политикам"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Обнулить счётчики и корзины")
+
+    def handle(self, *args, **options):
+        store = get_store()
+        if options['reset']:
+            store.reset()
+            self.stdout.write(self.style.SUCCESS("Счётчики и корзины очищены"))
+            return
+
+        config = get_config()
+        self.stdout.write(f"Хранилище: {store.path} ({'включено' if config['ENABLED'] else 'выключено'})")
+        self.stdout.write(f"Клиентов, расходующих лимит: {store.active_buckets()}")
+        rejects = store.rejects()
+        if not rejects:
+            self.stdout.write("Отказов нет")
+            return
+        for counter, count, last_at in rejects:
+            last = datetime.fromtimestamp(last_at).strftime('%Y-%m-%d %H:%M:%S')
+            self.stdout.write(f"{counter:<32} {count:>10}  последний {last}")
@@ -0,0 +1,14 @@
+"""Прогрев шаблонов, URLconf и кэшей (см. main/warmup.py)."""
+from django.core.management.base import BaseCommand
+
+from main.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Компилирует шаблоны, импортирует view и прогревает кэши"
+
+    def handle(self, *args, **options):
+        timings = warm_up()
+        for name, elapsed in timings.items():
+            self.stdout.write(f"{name:<14} {elapsed * 1000:8.1f} мс")
+        self.stdout.write(self.style.SUCCESS(f"Прогрев завершён за {sum(timings.values()):.2f} с"))
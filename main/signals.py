@@ -0,0 +1,21 @@
+"""Обработчики сигналов приложения main."""
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import backends
+
+
+@receiver(post_save, sender=User, dispatch_uid='main_auth_cache_saved')
+@receiver(post_delete, sender=User, dispatch_uid='main_auth_cache_deleted')
+def invalidate_cached_user(sender, instance: User, **kwargs) -> None:
+    """Смена пароля, прав или профиля сбрасывает закэшированного пользователя."""
+    backends.invalidate(instance.pk)
+
+
+@receiver(user_logged_out, dispatch_uid='main_auth_cache_logged_out')
+def invalidate_logged_out_user(sender, request, user, **kwargs) -> None:
+    """После выхода пользователь не должен оставаться в кэше."""
+    if user is not None:
+        backends.invalidate(user.pk)
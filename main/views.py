@@ -4,6 +4,9 @@ from django.contrib.auth.forms import AuthenticationForm
 from django.shortcuts import render, redirect
 from django.http import HttpRequest, HttpResponse
 from django import forms
+from core.page_cache import anonymous_page_cache
+from core.ratelimit import ratelimit
+from core.routers import read_only_view
 
 class RegisterForm(forms.ModelForm):
     password = forms.CharField(label='Пароль', widget=forms.PasswordInput)
@@ -19,10 +22,13 @@ class RegisterForm(forms.ModelForm):
             raise forms.ValidationError('Пароли не совпадают')
         return cd['password2']
 
+@anonymous_page_cache('index')
+@read_only_view
 def index(request: HttpRequest) -> HttpResponse:
     """Возвращает главную страницу сайта (index) через шаблон."""
     return render(request, "index.html")
 
+@ratelimit('register')
 def register(request: HttpRequest) -> HttpResponse:
     """Регистрация нового пользователя через форму."""
     if request.method == 'POST':
@@ -40,6 +46,7 @@ def register(request: HttpRequest) -> HttpResponse:
         'form': form,
     })
 
+@ratelimit('login')
 def login_view(request: HttpRequest) -> HttpResponse:
     """Вход пользователя с помощью стандартной формы аутентификации."""
     if request.method == 'POST':
@@ -0,0 +1,120 @@
+"""
+Прогрев процесса перед приёмом запросов.
+
+warm_up() компилирует все шаблоны в кэш загрузчика, импортирует URLconf
+и все view, открывает подключения к базам, строит индекс автодополнения
+и прогоняет несколько внутренних запросов (WARMUP_URLS) через обработчик
+WSGI, чтобы первый настоящий посетитель не платил за холодный старт.
+Внутренние запросы не расходуют лимиты core.ratelimit. Вызывается командой
+``manage.py warmup`` и хуком post_worker_init в gunicorn.conf.py — во
+втором случае прогревается сам воркер, до того как он начнёт принимать
+соединения.
+"""
+import io
+import logging
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.template.autoreload import get_template_directories
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from core.ratelimit import EXEMPT_META_KEY
+
+logger = logging.getLogger('main.warmup')
+
+
+def warm_up() -> dict[str, float]:
+    """Прогревает процесс и возвращает время каждого шага в секундах."""
+    steps = (
+        ('urls', warm_urls),
+        ('templates', warm_templates),
+        ('database', warm_database),
+        ('autocomplete', warm_autocomplete),
+        ('requests', warm_requests),
+    )
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            # Прогрев не должен мешать воркеру запуститься
+            logger.exception("Шаг прогрева %s завершился ошибкой", name)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def warm_urls() -> int:
+    """Импортирует URLconf и все view. Возвращает число маршрутов."""
+    count = 0
+    pending = [get_resolver()]
+    while pending:
+        resolver = pending.pop()
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver):
+                pending.append(pattern)
+            elif isinstance(pattern, URLPattern):
+                pattern.callback  # noqa: B018 - импорт view
+                count += 1
+    get_resolver().reverse_dict  # noqa: B018 - таблица для reverse()
+    return count
+
+
+def warm_templates() -> int:
+    """Компилирует все шаблоны проекта и приложений. Возвращает их число."""
+    count = 0
+    for engine in engines.all():
+        for directory in get_template_directories():
+            for path in Path(directory).rglob('*.html'):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    # Фрагменты чужих шаблонов (например, из админки) могут
+                    # не компилироваться отдельно
+                    continue
+                count += 1
+    return count
+
+
+def warm_database() -> None:
+    """Открывает подключения (с PRAGMA из настроек) ко всем базам."""
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def warm_autocomplete() -> int:
+    from blog import autocomplete
+
+    return autocomplete.index.build()
+
+
+def warm_requests() -> None:
+    """Прогоняет анонимные GET-запросы по адресам из WARMUP_URLS."""
+    host = next((host for host in settings.ALLOWED_HOSTS if host and '*' not in host), 'localhost')
+    handler = WSGIHandler()
+    for url in getattr(settings, 'WARMUP_URLS', ['/']):
+        parts = urlsplit(url)
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': parts.path or '/',
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': host.lstrip('.'),
+            'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': io.StringIO(),
+            EXEMPT_META_KEY: True,
+        }
+        response = handler(environ, lambda status, headers, exc_info=None: None)
+        for _ in response:
+            pass
+        response.close()
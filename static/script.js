@@ -1 +1,174 @@
-// JavaScript для будущих функций (если понадобится)
+// Бесконечная прокрутка лент постов.
+// Ссылка «Показать ещё» ведёт на полную страницу со следующим курсором
+// (работает и без JavaScript), а здесь вместо перехода подгружается
+// HTML-фрагмент со следующей страницей и вставляется на место ссылки.
+(function () {
+    'use strict';
+
+    function loadMore(block) {
+        var link = block.querySelector('.load-more-link');
+        if (!link || block.dataset.loading) {
+            return;
+        }
+        block.dataset.loading = '1';
+        link.textContent = 'Загрузка...';
+
+        fetch(link.dataset.fragmentUrl, {
+            credentials: 'same-origin',
+            headers: {'X-Requested-With': 'XMLHttpRequest'}
+        })
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                var template = document.createElement('template');
+                template.innerHTML = html;
+                var nextBlock = template.content.querySelector('.load-more');
+                block.replaceWith(template.content);
+                if (nextBlock) {
+                    observe(nextBlock);
+                }
+            })
+            .catch(function () {
+                // При ошибке оставляем обычную ссылку на следующую страницу
+                delete block.dataset.loading;
+                link.textContent = 'Показать ещё';
+            });
+    }
+
+    var observer = null;
+    if ('IntersectionObserver' in window) {
+        observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    loadMore(entry.target);
+                }
+            });
+        }, {rootMargin: '600px 0px'});
+    }
+
+    function observe(block) {
+        if (observer) {
+            observer.observe(block);
+        }
+    }
+
+    document.addEventListener('click', function (event) {
+        var link = event.target.closest('.load-more-link');
+        if (link && link.dataset.fragmentUrl) {
+            event.preventDefault();
+            loadMore(link.closest('.load-more'));
+        }
+    });
+
+    document.querySelectorAll('.load-more').forEach(observe);
+})();
+
+
+// Автодополнение в поиске пользователей.
+// Запрос уходит через 150 мс после последнего нажатия, а незавершённый
+// предыдущий запрос отменяется, чтобы старый ответ не перезаписал новый.
+(function () {
+    'use strict';
+
+    var DEBOUNCE_MS = 150;
+
+    document.querySelectorAll('input[data-autocomplete-url]').forEach(function (input) {
+        var list = input.form.querySelector('.autocomplete-list');
+        if (!list) {
+            return;
+        }
+        var timer = null;
+        var controller = null;
+        var active = -1;
+
+        function hide() {
+            list.hidden = true;
+            list.replaceChildren();
+            active = -1;
+        }
+
+        function show(results) {
+            list.replaceChildren();
+            active = -1;
+            results.forEach(function (result) {
+                var item = document.createElement('li');
+                var link = document.createElement('a');
+                link.href = result.url;
+                link.textContent = result.username;
+                if (result.name) {
+                    var name = document.createElement('span');
+                    name.className = 'autocomplete-name';
+                    name.textContent = result.name;
+                    link.appendChild(name);
+                }
+                item.appendChild(link);
+                list.appendChild(item);
+            });
+            list.hidden = results.length === 0;
+        }
+
+        function request(query) {
+            if (controller) {
+                controller.abort();
+            }
+            if (!query) {
+                hide();
+                return;
+            }
+            controller = new AbortController();
+            var url = input.dataset.autocompleteUrl + '?q=' + encodeURIComponent(query);
+            fetch(url, {credentials: 'same-origin', signal: controller.signal})
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error(response.status);
+                    }
+                    return response.json();
+                })
+                .then(function (data) {
+                    show(data.results);
+                })
+                .catch(function (error) {
+                    if (error.name !== 'AbortError') {
+                        hide();
+                    }
+                });
+        }
+
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(request, DEBOUNCE_MS, input.value.trim());
+        });
+
+        input.addEventListener('keydown', function (event) {
+            var links = list.querySelectorAll('a');
+            if (list.hidden || !links.length) {
+                return;
+            }
+            if (event.key === 'ArrowDown' || event.key === 'ArrowUp') {
+                event.preventDefault();
+                if (active >= 0) {
+                    links[active].classList.remove('active');
+                }
+                var step = event.key === 'ArrowDown' ? 1 : -1;
+                active = (active + step + links.length) % links.length;
+                links[active].classList.add('active');
+            } else if (event.key === 'Enter' && active >= 0) {
+                event.preventDefault();
+                window.location.href = links[active].href;
+            } else if (event.key === 'Escape') {
+                hide();
+            }
+        });
+
+        document.addEventListener('click', function (event) {
+            if (!input.form.contains(event.target)) {
+                hide();
+            }
+        });
+    });
+})();
@@ -7,6 +7,8 @@ set -e  # Остановить выполнение при любой ошибк
 PROJECT_DIR="/root/Projects/makrei_online"   # Папка проекта на сервере
 VENV_DIR="$PROJECT_DIR/venv"                 # Виртуальное окружение
 SERVICE_NAME="makrei_online.service"         # Название службы Gunicorn
+SITE_URL="https://makrei.online"             # Адрес для проверки первого запроса
+WORKER_SERVICE_NAME="makrei_online_worker.service"  # Воркер фоновых задач (run_worker)
 
 echo "--- НАЧАЛО ОБНОВЛЕНИЯ ---"
 
@@ -58,14 +60,75 @@ echo "DEBUG установлен в False"
 # ===============================
 # Сборка статики
 # ===============================
-echo "7. Собираем статику..."
+echo "7. Собираем статику (минификация, хеши в именах, .gz/.br)..."
+# Старые файлы с хешами не удаляются (без --clear): страницы, закэшированные
+# до выкладки, ещё ссылаются на них
 python manage.py collectstatic --noinput
 
 # ===============================
-# Перезапуск Gunicorn
+# Прогрев общих кэшей
+# ===============================
+# Каждый воркер gunicorn прогревается сам (post_worker_init). Отдельный
+# процесс может прогреть только общий кэш (DJANGO_CACHE=file или db):
+# кэш в памяти (locmem) у каждого процесса свой.
+echo "8. Прогреваем общие кэши..."
+CACHE_BACKEND="${DJANGO_CACHE:-$(systemctl show -p Environment --value $SERVICE_NAME | tr ' ' '\n' | sed -n 's/^DJANGO_CACHE=//p')}"
+case "$CACHE_BACKEND" in
+    file|db) DJANGO_CACHE="$CACHE_BACKEND" python manage.py warmup ;;
+    *) echo "Кэш в памяти процесса (${CACHE_BACKEND:-locmem}): воркеры прогреются при запуске" ;;
+esac
+
 # ===============================
-echo "8. Перезапускаем Gunicorn..."
-sudo systemctl restart $SERVICE_NAME
+# Плавная перезагрузка Gunicorn
+# ===============================
+# HUP мастеру: новые воркеры с новым кодом прогреваются (gunicorn.conf.py)
+# и начинают принимать запросы, старые дообслуживают текущие и выходят.
+echo "9. Перезагружаем Gunicorn без простоя..."
+RELOAD_STARTED=$(date +%s)
+# Старые воркеры дообслуживают запросы параллельно с новыми: запоминаем их,
+# чтобы считать только новых
+OLD_WORKERS=""
+if sudo systemctl is-active --quiet $SERVICE_NAME; then
+    OLD_WORKERS=$(pgrep -P "$(systemctl show -p MainPID --value $SERVICE_NAME)" || true)
+    sudo systemctl kill --kill-who=main --signal=HUP $SERVICE_NAME
+else
+    echo "Служба не запущена, запускаем..."
+    sudo systemctl start $SERVICE_NAME
+fi
+
+# Ждём, пока старые воркеры выйдут, а все новые сообщат о прогреве
+READY=0
+WORKERS=0
+for _ in $(seq 1 60); do
+    OLD_ALIVE=0
+    for pid in $OLD_WORKERS; do
+        kill -0 "$pid" 2>/dev/null && OLD_ALIVE=$((OLD_ALIVE + 1))
+    done
+    WORKERS=$(( $(pgrep -P "$(systemctl show -p MainPID --value $SERVICE_NAME)" | wc -l) - OLD_ALIVE ))
+    READY=$(journalctl -u $SERVICE_NAME --since "@$RELOAD_STARTED" -o cat | grep -c "прогрет" || true)
+    [ "$OLD_ALIVE" -eq 0 ] && [ "$WORKERS" -gt 0 ] && [ "$READY" -ge "$WORKERS" ] && break
+    sleep 1
+done
+echo "Запуск воркеров (прогрето $READY из $WORKERS):"
+journalctl -u $SERVICE_NAME --since "@$RELOAD_STARTED" -o cat | grep "прогрет" || true
+echo "Перезагрузка заняла $(( $(date +%s) - RELOAD_STARTED )) с"
+
+# Первый запрос после выкладки
+FIRST_REQUEST=$(curl -s -o /dev/null -w '%{http_code} за %{time_total} с' "${SITE_URL}/")
+echo "Первый запрос к ${SITE_URL}/: $FIRST_REQUEST"
 echo "Статус службы: $(sudo systemctl is-active $SERVICE_NAME)"
 
+# ===============================
+# Перезапуск воркера фоновых задач
+# ===============================
+# SIGTERM: воркер доделывает текущую задачу, остальные ждут в очереди
+echo "10. Перезапускаем воркер фоновых задач..."
+if systemctl list-unit-files "$WORKER_SERVICE_NAME" --no-legend | grep -q .; then
+    sudo systemctl restart $WORKER_SERVICE_NAME
+    echo "Статус воркера: $(sudo systemctl is-active $WORKER_SERVICE_NAME)"
+else
+    echo "ВНИМАНИЕ: служба $WORKER_SERVICE_NAME не установлена, задачи копятся в очереди"
+    echo "(ExecStart=$VENV_DIR/bin/python $PROJECT_DIR/manage.py run_worker)"
+fi
+
 echo "--- ОБНОВЛЕНИЕ ЗАВЕРШЕНО ---"